@@ -0,0 +1,41 @@
+"""
+Counting paths through a trail by their number of mountains.
+
+Path counts are kept as (vector, shift): vector[j] paths have j + shift
+mountains. A mountain in series only adds one to the shift, so long
+series share one vector, and only splits combine vectors.
+"""
+from __future__ import annotations
+
+PathCounts = tuple[list[int], int]
+
+def spread(counts: PathCounts, k: int) -> list[int]:
+    """The number of paths with 0..k mountains, as a plain list."""
+    vector, shift = counts
+    res = [0] * (k + 1)
+    for i in range(min(len(vector), k + 1 - shift)):
+        res[i + shift] = vector[i]
+    return res
+
+def count_at(counts: PathCounts, j: int) -> int:
+    vector, shift = counts
+    j -= shift
+    return vector[j] if 0 <= j < len(vector) else 0
+
+def either(a: PathCounts, b: PathCounts, k: int) -> PathCounts:
+    """Counts for taking one of two branches."""
+    return [x + y for x, y in zip(spread(a, k), spread(b, k))], 0
+
+def then(a: PathCounts, b: PathCounts, k: int) -> PathCounts:
+    """
+    Counts for a path through a then b, up to k mountains.
+
+    :complexity: O(k^2)
+    """
+    first, second = spread(a, k), spread(b, k)
+    res = [0] * (k + 1)
+    for i in range(k + 1):
+        if first[i]:
+            for j in range(k + 1 - i):
+                res[i + j] += first[i] * second[j]
+    return res, 0
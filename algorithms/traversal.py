@@ -0,0 +1,88 @@
+from __future__ import annotations
+from typing import Callable, Iterator, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+def depth_first(
+    root: T,
+    children: Callable[[T], Sequence[T]],
+    pre: Callable[[T], None]|None = None,
+    post: Callable[[T], None]|None = None,
+) -> None:
+    """
+    Walk a tree depth first using an explicit stack rather than recursion,
+    so the depth of the tree is not limited by Python's recursion limit.
+
+    For every node, `pre` is called, then `children` gives the nodes to
+    visit below it (in order), and once all of those have been visited
+    `post` is called. `children` is only called when the node is reached,
+    so it may decide which children to visit based on earlier visits.
+
+    :complexity: O(N * (pre + children + post)) where N is the number of nodes visited.
+    """
+    # Entries are (node, expanded): expanded nodes are waiting for their post hook.
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            post(node)
+            continue
+        if pre is not None:
+            pre(node)
+        if post is not None:
+            stack.append((node, True))
+        kids = children(node)
+        for i in range(len(kids) - 1, -1, -1):
+            stack.append((kids[i], False))
+
+def preorder(root: T, children: Callable[[T], Sequence[T]]) -> Iterator[T]:
+    """
+    Lazily yield the nodes of a tree in the order depth_first visits them,
+    using an explicit stack rather than recursion.
+
+    Only the nodes still waiting to be visited are held, so stopping
+    early never looks at the rest of the tree.
+
+    :complexity: O(children) per node yielded.
+    """
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        kids = children(node)
+        for i in range(len(kids) - 1, -1, -1):
+            stack.append(kids[i])
+
+def fold(
+    root: T,
+    children: Callable[[T], Sequence[T]],
+    combine: Callable[[T, list[R]], R],
+) -> R:
+    """
+    Evaluate a tree bottom up using an explicit stack rather than recursion.
+
+    `combine(node, values)` is given the values of the node's children
+    (in the order `children` returned them), and returns the node's value.
+
+    :return: The value of root.
+    :complexity: O(N * (children + combine)) where N is the number of nodes.
+    """
+    values = []
+    # Entries are (node, number of children) once expanded, (node, -1) before.
+    stack = [(root, -1)]
+    while stack:
+        node, count = stack.pop()
+        if count >= 0:
+            if count:
+                child_values = values[-count:]
+                del values[-count:]
+            else:
+                child_values = []
+            values.append(combine(node, child_values))
+            continue
+        kids = children(node)
+        stack.append((node, len(kids)))
+        for i in range(len(kids) - 1, -1, -1):
+            stack.append((kids[i], -1))
+    return values[0]
@@ -0,0 +1,63 @@
+"""
+Memory and time of DoubleKeyTable against FlatDoubleKeyTable.
+
+Many 1st keys with only a few 2nd keys each is the worst case for the
+nested layout, where every 1st key has a whole table of its own (unless
+lazy_inner is set and it only has one). Memory is
+the peak traced by tracemalloc while filling the table, time is the best
+of a few runs at filling it and then reading every pair back.
+
+Run from the repository root with `python -m benchmarks.bench_double_key_memory`.
+"""
+from __future__ import annotations
+from functools import partial
+from time import perf_counter
+import tracemalloc
+
+from double_key_table import DoubleKeyTable, FlatDoubleKeyTable
+
+# (number of 1st keys, 2nd keys per 1st key)
+SHAPES = [(10000, 1), (1000, 2), (10000, 2), (10000, 8), (1000, 64)]
+REPEATS = 3
+
+def pairs(outer: int, inner: int) -> list[tuple[str, str]]:
+    return [(f"k{i}", f"v{j}") for i in range(outer) for j in range(inner)]
+
+def fill(table_type, keys: list[tuple[str, str]]) -> DoubleKeyTable:
+    table = table_type()
+    for i, key in enumerate(keys):
+        table[key] = i
+    return table
+
+def measure_memory(table_type, keys: list[tuple[str, str]]) -> int:
+    tracemalloc.start()
+    table = fill(table_type, keys)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del table
+    return peak
+
+def measure_time(table_type, keys: list[tuple[str, str]]) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = perf_counter()
+        table = fill(table_type, keys)
+        for key in keys:
+            table[key]
+        best = min(best, perf_counter() - start)
+    return best
+
+LAYOUTS = [
+    ("nested", DoubleKeyTable),
+    ("lazy", partial(DoubleKeyTable, lazy_inner=True)),
+    ("flat", FlatDoubleKeyTable),
+]
+
+if __name__ == "__main__":
+    print(f"{'shape':>10}" + "".join(f" {name + ' (MB)':>12}" for name, _ in LAYOUTS) + "".join(f" {name + ' (s)':>11}" for name, _ in LAYOUTS))
+    for outer, inner in SHAPES:
+        keys = pairs(outer, inner)
+        memory = [measure_memory(table_type, keys) for _, table_type in LAYOUTS]
+        times = [measure_time(table_type, keys) for _, table_type in LAYOUTS]
+        shape = f"{outer}x{inner}"
+        print(f"{shape:>10}" + "".join(f" {m / 2**20:>12.2f}" for m in memory) + "".join(f" {t:>11.3f}" for t in times))
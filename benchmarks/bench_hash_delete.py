@@ -0,0 +1,59 @@
+"""
+Delete cost against cluster length for LinearProbeTable.
+
+Every key is forced to the same home slot, so the whole table is a single
+cluster and deleting its first key has to fix up every entry after it.
+Backward-shift deletion (the current `__delitem__`) is compared against
+the old strategy of clearing the rest of the cluster and reinserting it.
+
+Run from the repository root with `python -m benchmarks.bench_hash_delete`.
+"""
+from __future__ import annotations
+from time import perf_counter
+
+from data_structures.hash_table import LinearProbeTable
+
+CLUSTER_LENGTHS = [16, 64, 256, 1024, 4096]
+REPEATS = 5
+
+def make_cluster(length: int) -> LinearProbeTable[str, int]:
+    # Table large enough to never resize, with every key hashing to 0.
+    table = LinearProbeTable(sizes=[2 * length + 1])
+    table.hash = lambda key: 0
+    for i in range(length):
+        table[str(i)] = i
+    return table
+
+def reinsert_delete(table: LinearProbeTable, key: str) -> None:
+    """The previous deletion: empty the rest of the cluster and reinsert it."""
+    position = table._linear_probe(key, False)
+    table.key_array[position] = None
+    table.value_array[position] = None
+    table.count -= 1
+    position = (position + 1) % table.table_size
+    while table.key_array[position] is not None:
+        key2 = table.key_array[position]
+        value = table.value_array[position]
+        table.key_array[position] = None
+        table.value_array[position] = None
+        table[key2] = value
+        position = (position + 1) % table.table_size
+
+def time_delete(length: int, delete) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        table = make_cluster(length)
+        start = perf_counter()
+        delete(table, "0")
+        best = min(best, perf_counter() - start)
+    return best
+
+def backward_shift_delete(table: LinearProbeTable, key: str) -> None:
+    del table[key]
+
+if __name__ == "__main__":
+    print(f"{'cluster':>8} {'reinsert (ms)':>14} {'shift (ms)':>11} {'speedup':>8}")
+    for length in CLUSTER_LENGTHS:
+        old = time_delete(length, reinsert_delete)
+        new = time_delete(length, backward_shift_delete)
+        print(f"{length:>8} {old * 1000:>14.3f} {new * 1000:>11.3f} {old / new:>7.1f}x")
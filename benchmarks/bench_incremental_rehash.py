@@ -0,0 +1,50 @@
+"""
+Insert latency of tables resized all at once against incrementally.
+
+Every insert into a LinearProbeTable and a DoubleKeyTable is timed on its
+own. A full resize shows up as a few very slow inserts, an incremental one
+spreads the same work over the inserts after it. The garbage collector
+is turned off while timing, as timeit does, or its own pauses dominate.
+
+Run from the repository root with `python -m benchmarks.bench_incremental_rehash`.
+"""
+from __future__ import annotations
+from time import perf_counter
+import gc
+
+from data_structures.hash_table import LinearProbeTable
+from double_key_table import DoubleKeyTable
+
+INSERTS = 200000
+
+def latencies(table, keys: list) -> list[float]:
+    res = []
+    gc.disable()
+    try:
+        for i, key in enumerate(keys):
+            start = perf_counter()
+            table[key] = i
+            res.append(perf_counter() - start)
+    finally:
+        gc.enable()
+    return sorted(res)
+
+def percentile(times: list[float], p: float) -> float:
+    return times[min(len(times) - 1, int(len(times) * p))]
+
+if __name__ == "__main__":
+    flat_keys = [str(i) for i in range(INSERTS)]
+    pair_keys = [(str(i), str(i % 3)) for i in range(INSERTS)]
+    cases = [
+        ("LinearProbeTable", lambda incremental: LinearProbeTable(incremental=incremental), flat_keys),
+        ("DoubleKeyTable", lambda incremental: DoubleKeyTable(incremental=incremental), pair_keys),
+    ]
+    print(f"{'table':>16} {'mode':>11} {'p50 (us)':>9} {'p99 (us)':>9} {'max (ms)':>9} {'total (s)':>10}")
+    for name, make, keys in cases:
+        for incremental in (False, True):
+            times = latencies(make(incremental), keys)
+            mode = "incremental" if incremental else "full"
+            print(
+                f"{name:>16} {mode:>11} {percentile(times, 0.5) * 1e6:>9.2f} {percentile(times, 0.99) * 1e6:>9.2f}"
+                f" {times[-1] * 1000:>9.2f} {sum(times):>10.3f}"
+            )
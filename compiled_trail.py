@@ -0,0 +1,294 @@
+"""
+A trail compiled into flat arrays, for analytics and simulation on trails
+far too big to keep as Trail, TrailSeries, TrailSplit and Mountain objects.
+
+Trails are numbered in pre-order (the order collect_all_mountains visits
+them), so the first trail inside trail i is always trail i + 1:
+    * kinds[i] is EMPTY, SERIES or SPLIT.
+    * For a series, mountains[i] is the index of its mountain, and i + 1 is the following trail.
+    * For a split, i + 1 is the top branch, bottoms[i] the bottom branch and follows[i] the following trail.
+Unused entries are -1. Mountains are stored once each (by identity) in
+the parallel names, difficulties and lengths.
+
+That is 13 bytes per trail plus 16 per mountain and its name, against
+several hundred for the objects. All arrays are `array.array`s, so NumPy
+can view them without copying. They must not be changed.
+"""
+from __future__ import annotations
+from array import array
+from typing import Callable, Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from algorithms.path_counts import PathCounts, count_at, either, then
+from algorithms.traversal import depth_first, fold
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+
+# Typecode of trail and mountain indices, so at most 2**31 - 1 of each.
+INDEX_TYPECODE = 'i'
+
+class CompiledTrail:
+
+    EMPTY = 0
+    SERIES = 1
+    SPLIT = 2
+
+    def __init__(self) -> None:
+        """An empty compiled trail, to be filled in by from_trail."""
+        self.kinds = array('b')
+        self.mountains = array(INDEX_TYPECODE)
+        self.bottoms = array(INDEX_TYPECODE)
+        self.follows = array(INDEX_TYPECODE)
+        self.names = []
+        self.difficulties = array('q')
+        self.lengths = array('q')
+
+    @classmethod
+    def from_trail(cls, trail: Trail) -> CompiledTrail:
+        """
+        Compile a trail.
+
+        :complexity: O(N) where N is the number of trails inside trail.
+        """
+        res = cls()
+        mountain_index = {}
+        # Frames are (trail, index of the split it is a branch of, or -1, follows or bottoms).
+        def visit(frame: tuple[Trail, int, array|None]) -> None:
+            cur_trail, split, slot = frame
+            index = len(res.kinds)
+            if slot is not None:
+                slot[split] = index
+            store = cur_trail.store
+            if store is None:
+                res.kinds.append(cls.EMPTY)
+                res.mountains.append(-1)
+            elif isinstance(store, TrailSeries):
+                mountain = store.mountain
+                if id(mountain) not in mountain_index:
+                    mountain_index[id(mountain)] = len(res.names)
+                    res.names.append(mountain.name)
+                    res.difficulties.append(mountain.difficulty_level)
+                    res.lengths.append(mountain.length)
+                res.kinds.append(cls.SERIES)
+                res.mountains.append(mountain_index[id(mountain)])
+            else:
+                res.kinds.append(cls.SPLIT)
+                res.mountains.append(-1)
+            res.bottoms.append(-1)
+            res.follows.append(-1)
+
+        def children(frame: tuple[Trail, int, array|None]) -> tuple:
+            cur_trail = frame[0]
+            store = cur_trail.store
+            if store is None:
+                return ()
+            if isinstance(store, TrailSeries):
+                return ((store.following, -1, None),)
+            # visit has just numbered this split.
+            index = len(res.kinds) - 1
+            return (
+                (store.path_top, -1, None),
+                (store.path_bottom, index, res.bottoms),
+                (store.path_follow, index, res.follows),
+            )
+
+        depth_first((trail, -1, None), children, pre=visit)
+        return res
+
+    def __len__(self) -> int:
+        """
+        The number of trails, including empty ones.
+
+        :complexity: O(1)
+        """
+        return len(self.kinds)
+
+    def children(self, index: int) -> tuple[int, ...]:
+        """
+        The trails directly inside trail index, in the same order as Trail.children.
+
+        :complexity: O(1)
+        """
+        kind = self.kinds[index]
+        if kind == self.EMPTY:
+            return ()
+        if kind == self.SERIES:
+            return (index + 1,)
+        return (index + 1, self.bottoms[index], self.follows[index])
+
+    def mountain(self, index: int) -> Mountain:
+        """
+        A new Mountain with the attributes of mountain index.
+
+        :complexity: O(1)
+        """
+        return Mountain(self.names[index], self.difficulties[index], self.lengths[index])
+
+    def to_trail(self) -> Trail:
+        """
+        Rebuild the trail as objects, with one Mountain per stored mountain.
+
+        :complexity: O(N) where N is the number of trails.
+        """
+        mountains = [self.mountain(i) for i in range(len(self.names))]
+        def combine(index: int, inner: list[Trail]) -> Trail:
+            kind = self.kinds[index]
+            if kind == self.EMPTY:
+                return Trail(None)
+            if kind == self.SERIES:
+                return Trail(TrailSeries(mountains[self.mountains[index]], inner[0]))
+            return Trail(TrailSplit(*inner))
+
+        return fold(0, self.children, combine)
+
+    def mountain_order(self) -> array:
+        """
+        The index of every mountain collect_all_mountains would list, in that order.
+        Since trails are numbered in pre-order, these are just the series' mountains.
+
+        :complexity: O(N), in NumPy when installed.
+        """
+        if np is not None and len(self.kinds):
+            kinds = np.frombuffer(self.kinds, dtype=np.int8)
+            mountains = np.frombuffer(self.mountains, dtype=np.dtype(INDEX_TYPECODE))
+            return array(INDEX_TYPECODE, mountains[kinds == self.SERIES].tobytes())
+        return array(INDEX_TYPECODE, [m for k, m in zip(self.kinds, self.mountains) if k == self.SERIES])
+
+    def iter_mountains(self) -> Iterator[Mountain]:
+        """
+        Lazily yields all mountains, as Trail.iter_mountains does.
+
+        :complexity: O(1) amortised per trail.
+        """
+        for kind, index in zip(self.kinds, self.mountains):
+            if kind == self.SERIES:
+                yield self.mountain(index)
+
+    def collect_all_mountains(self) -> list[Mountain]:
+        """
+        Returns a list of all mountains on the trail, as Trail.collect_all_mountains does.
+
+        :complexity: O(N) where N is the number of trails.
+        """
+        return [self.mountain(index) for index in self.mountain_order()]
+
+    def count_length_k_paths(self, k: int) -> int:
+        """
+        Returns the number of paths containing exactly k mountains, as Trail.count_length_k_paths does.
+
+        Trails only contain trails with higher numbers, so counts are worked
+        out from the last trail back, keeping only those still to be used.
+
+        :complexity: O(N + S*k^2) where N is the number of trails and S the number of splits.
+        :raises ValueError: when k is negative.
+        """
+        if k < 0:
+            raise ValueError("k must not be negative.")
+        # Counts of bottom branches and following trails, until their split is reached.
+        kept: dict[int, PathCounts] = {}
+        wanted = set()
+        for index in range(len(self.kinds)):
+            if self.kinds[index] == self.SPLIT:
+                wanted.add(self.bottoms[index])
+                wanted.add(self.follows[index])
+        counts = None
+        for index in range(len(self.kinds) - 1, -1, -1):
+            kind = self.kinds[index]
+            if kind == self.EMPTY:
+                counts = ([1], 0)
+            elif kind == self.SERIES:
+                counts = (counts[0], counts[1] + 1)
+            else:
+                bottom = kept.pop(self.bottoms[index])
+                follow = kept.pop(self.follows[index])
+                counts = then(either(counts, bottom, k), follow, k)
+            if index in wanted:
+                kept[index] = counts
+        return count_at(counts, k)
+
+    def walk(self, select_branch: Callable[[int, int], bool]) -> array:
+        """
+        Follow one path, choosing branches with select_branch(top, bottom),
+        given the numbers of the branch trails.
+
+        :return: The indices of the mountains along the path, in order.
+        :complexity: O(L) where L is the number of trails along the path,
+            plus the cost of select_branch.
+        """
+        res = array(INDEX_TYPECODE)
+        self._walk(select_branch, res.append)
+        return res
+
+    def _walk(self, select_branch: Callable[[int, int], bool], add_mountain: Callable[[int], None]) -> None:
+        """
+        Walk one path as walk does, passing the index of each mountain to
+        add_mountain as it is reached, before any later branch is chosen.
+
+        :complexity: O(L) where L is the number of trails along the path,
+            plus the cost of the calls.
+        """
+        # Following trails of the splits we are inside.
+        pending = []
+        index = 0
+        while True:
+            kind = self.kinds[index]
+            if kind == self.SERIES:
+                add_mountain(self.mountains[index])
+                index += 1
+            elif kind == self.SPLIT:
+                pending.append(self.follows[index])
+                index = index + 1 if select_branch(index + 1, self.bottoms[index]) else self.bottoms[index]
+            elif pending:
+                index = pending.pop()
+            else:
+                return
+
+    def view(self, index: int) -> TrailView:
+        """A view of trail index shaped like a Trail, for walker personalities."""
+        return TrailView(self, index)
+
+    def follow_path(self, personality) -> None:
+        """
+        Follow a path and add mountains according to a personality, as Trail.follow_path does.
+        The branches the personality chooses between are TrailViews, and
+        each mountain is added as it is reached, so choices can depend on
+        the mountains added so far.
+
+        :complexity: O(L) where L is the number of trails along the path,
+            plus the cost of the personality's choices.
+        """
+        self._walk(
+            lambda top, bottom: personality.select_branch(self.view(top), self.view(bottom)),
+            lambda index: personality.add_mountain(self.mountain(index)),
+        )
+
+class TrailView:
+    """
+    One trail of a CompiledTrail, with a store built on demand
+    (a TrailSeries or TrailSplit of further views, or None),
+    so personalities can look at branches as they do with a Trail.
+    """
+
+    __slots__ = ('compiled', 'index')
+
+    def __init__(self, compiled: CompiledTrail, index: int) -> None:
+        self.compiled = compiled
+        self.index = index
+
+    @property
+    def store(self) -> TrailSeries|TrailSplit|None:
+        compiled, index = self.compiled, self.index
+        kind = compiled.kinds[index]
+        if kind == CompiledTrail.EMPTY:
+            return None
+        if kind == CompiledTrail.SERIES:
+            return TrailSeries(compiled.mountain(compiled.mountains[index]), TrailView(compiled, index + 1))
+        return TrailSplit(
+            TrailView(compiled, index + 1),
+            TrailView(compiled, compiled.bottoms[index]),
+            TrailView(compiled, compiled.follows[index]),
+        )
@@ -7,8 +7,10 @@ __author__ = 'Jackson Goerner'
 __since__ = '07/02/2023'
 
 
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, Iterable, Iterator
 from data_structures.referential_array import ArrayR
+from data_structures.typed_array import IntArray
+from data_structures.hashing import polynomial_hash, polynomial_hash_many
 
 K = TypeVar('K')
 V = TypeVar('V')
@@ -16,6 +18,9 @@ V = TypeVar('V')
 class FullError(Exception):
     pass
 
+# Left in an old array, during an incremental resize, where an entry was taken out early.
+_MOVED = object()
+
 
 class LinearProbeTable(Generic[K, V]):
     """
@@ -26,6 +31,28 @@ class LinearProbeTable(Generic[K, V]):
                 Otherwise `hash` should be overwritten.
         - V:    Value Type.
 
+    Keys, values and the hash each key was placed with are kept in three
+    parallel arrays, so no tuple is allocated per entry and entries can be
+    moved around without hashing their key again.
+    An empty slot is one whose key is None.
+
+    The table grows once more than MAX_LOAD_FACTOR (under 1) of its slots
+    are used, and shrinks once fewer than MIN_LOAD_FACTOR are (never, by
+    default).
+    Both can be set per instance.
+
+    The iter_* methods and views read the table lazily. Every insert of a
+    new key, delete and resize bumps `modifications`, and an iteration
+    that sees it change raises a RuntimeError rather than skipping or
+    repeating entries.
+
+    With INCREMENTAL set, a resize only allocates the new arrays. The old
+    ones are kept read-only and moved over MIGRATE_STEP slots at a time by
+    every later set or delete, so no single write pays for the whole
+    table. Until then lookups fall back to the old arrays, and keys
+    written or deleted there are first taken out (leaving _MOVED behind).
+    Iterating finishes the move first.
+
     Unless stated otherwise, all methods have O(1) complexity.
     """
 
@@ -34,33 +61,94 @@ class LinearProbeTable(Generic[K, V]):
 
     HASH_BASE = 31
 
-    def __init__(self, sizes=None) -> None:
+    MAX_LOAD_FACTOR = 0.5
+    MIN_LOAD_FACTOR = 0
+
+    INCREMENTAL = False
+    # Old slots moved per write. Growing at least doubles the size, so the
+    # move is done well before the next resize.
+    MIGRATE_STEP = 4
+
+    # Set while hashing for the old arrays, as hashes depend on table_size.
+    _hashing_size: int|None = None
+
+    def __init__(self, sizes=None, max_load_factor:float|None=None, min_load_factor:float|None=None, incremental:bool|None=None) -> None:
         """
         Initialise the Hash Table.
+
+        :raises ValueError: when the load factors are out of range, or so
+            close that a shrink could immediately be followed by a grow.
         """
         if sizes is not None:
             self.TABLE_SIZES = sizes
+        if max_load_factor is not None:
+            self.MAX_LOAD_FACTOR = max_load_factor
+        if min_load_factor is not None:
+            self.MIN_LOAD_FACTOR = min_load_factor
+        if incremental is not None:
+            self.INCREMENTAL = incremental
+        if not 0 < self.MAX_LOAD_FACTOR < 1:
+            # The load is checked after an insert, so a full table would need
+            # its last slot before it could grow.
+            raise ValueError("Maximum load factor should be in (0, 1).")
+        if self.MIN_LOAD_FACTOR < 0:
+            raise ValueError("Minimum load factor should not be negative.")
+        if self.MIN_LOAD_FACTOR > 0:
+            # Hysteresis: a table just shrunk must be under the maximum load,
+            # and a table just grown must be over the minimum load.
+            for smaller, larger in zip(self.TABLE_SIZES, self.TABLE_SIZES[1:]):
+                if self.MIN_LOAD_FACTOR * larger > self.MAX_LOAD_FACTOR * smaller:
+                    raise ValueError("Minimum load factor too close to the maximum for these table sizes.")
         self.size_index = 0
-        self.array:ArrayR[tuple[K, V]] = ArrayR(self.TABLE_SIZES[self.size_index])
+        self.modifications = 0
+        self._allocate(self.TABLE_SIZES[self.size_index])
         self.count = 0
+        # Arrays being moved out of by an incremental resize, and the next slot to move.
+        self.old_key_array: ArrayR[K]|None = None
+        self.old_value_array: ArrayR[V]|None = None
+        self.old_hash_array: IntArray|None = None
+        self.migrated = 0
+
+    def _allocate(self, size: int) -> None:
+        """
+        Replace the storage with empty arrays of the given size.
+
+        :complexity: O(size)
+        """
+        self.modifications += 1
+        self.key_array: ArrayR[K] = ArrayR(size)
+        self.value_array: ArrayR[V] = ArrayR(size)
+        self.hash_array = IntArray(size)
 
     def hash(self, key: K) -> int:
         """
         Hash a key for insert/retrieve/update into the hashtable.
 
-        :complexity: O(len(key))
+        :complexity: O(len(key)), O(1) if recently hashed for this size.
         """
+        return polynomial_hash(key, self.table_size, self.HASH_BASE)
 
-        value = 0
-        a = 31415
-        for char in key:
-            value = (ord(char) + a * value) % self.table_size
-            a = a * self.HASH_BASE % (self.table_size - 1)
-        return value
+    def _hash_many(self, keys: list[K]) -> list[int]:
+        """
+        Hash many keys at once, unless `hash` has been overwritten.
+
+        :complexity: See polynomial_hash_many.
+        """
+        if "hash" in self.__dict__ or type(self).hash is not LinearProbeTable.hash:
+            return [self.hash(key) for key in keys]
+        return polynomial_hash_many(keys, self.table_size, self.HASH_BASE)
 
     @property
     def table_size(self) -> int:
-        return len(self.array)
+        if self._hashing_size is not None:
+            return self._hashing_size
+        return len(self.key_array)
+
+    def is_migrating(self) -> bool:
+        """
+        Whether an incremental resize still has entries in the old arrays.
+        """
+        return self.old_key_array is not None
 
     def __len__(self) -> int:
         """
@@ -71,23 +159,42 @@ class LinearProbeTable(Generic[K, V]):
     def _linear_probe(self, key: K, is_insert: bool) -> int:
         """
         Find the correct position for this key in the hash table using linear probing.
+
+        While migrating, a key still in the old arrays is moved over first,
+        so the position is always one in key_array.
         :complexity best: O(hash(key)) first position is empty
         :complexity worst: O(hash(key) + N*comp(K)) when we've searched the entire table
                         where N is the tablesize
         :raises KeyError: When the key is not in the table, but is_insert is False.
         :raises FullError: When a table is full and cannot be inserted.
         """
-        # Initial position
-        position = self.hash(key)
+        home = self.hash(key)
+        if self.old_key_array is not None:
+            self._take_old(key, home)
+        return self._probe(key, home, is_insert)
+
+    def _probe(self, key: K, home: int, is_insert: bool) -> int:
+        """
+        Linear probe for a key whose hash is already known.
+
+        Slots holding a different hash are skipped without comparing keys.
+        :complexity best: O(1) first position is empty
+        :complexity worst: O(N*comp(K)) when we've searched the entire table
+                        where N is the tablesize
+        :raises KeyError: When the key is not in the table, but is_insert is False.
+        :raises FullError: When a table is full and cannot be inserted.
+        """
+        position = home
 
         for _ in range(self.table_size):
-            if self.array[position] is None:
+            stored = self.key_array[position]
+            if stored is None:
                 # Empty spot. Am I upserting or retrieving?
                 if is_insert:
                     return position
                 else:
                     raise KeyError(key)
-            elif self.array[position][0] == key:
+            elif self.hash_array[position] == home and stored == key:
                 return position
             else:
                 # Taken by something else. Time to linear probe.
@@ -98,17 +205,110 @@ class LinearProbeTable(Generic[K, V]):
         else:
             raise KeyError(key)
 
+    def _place(self, key: K, data: V, home: int) -> None:
+        """
+        Put a key known not to be in the table into the first empty slot from home.
+
+        :complexity best: O(1) home is empty
+        :complexity worst: O(N) where N is the tablesize
+        """
+        position = home
+        while self.key_array[position] is not None:
+            position = (position + 1) % self.table_size
+        self.key_array[position] = key
+        self.value_array[position] = data
+        self.hash_array[position] = home
+
+    def _insert_at(self, position: int, key: K, data: V, home: int) -> None:
+        """
+        Store a new key at the position found by an inserting probe.
+        """
+        self.key_array[position] = key
+        self.value_array[position] = data
+        self.hash_array[position] = home
+
+    def _old_home(self, key: K) -> int:
+        """
+        Hash a key for the old arrays, by hashing while table_size is their size.
+        This works for overwritten hashes too, as long as they use table_size.
+        """
+        self._hashing_size = len(self.old_key_array)
+        try:
+            return self.hash(key)
+        finally:
+            self._hashing_size = None
+
+    def _old_position(self, key: K) -> int|None:
+        """
+        Find a key still waiting to be moved in the old arrays.
+
+        Slots before `migrated` were already moved (or deleted since), so
+        a key found there doesn't count.
+        :complexity best: O(hash(key)) first position is empty
+        :complexity worst: O(hash(key) + M*comp(K)) where M is the old table size.
+        """
+        keys = self.old_key_array
+        size = len(keys)
+        home = self._old_home(key)
+        position = home
+        for _ in range(size):
+            stored = keys[position]
+            if stored is None:
+                return None
+            if stored is not _MOVED and self.old_hash_array[position] == home and stored == key:
+                return position if position >= self.migrated else None
+            position = (position + 1) % size
+        return None
+
+    def _take_old(self, key: K, home: int) -> None:
+        """
+        Move a key from the old arrays into the table now, if it is still there.
+
+        :complexity: See old position, plus place.
+        """
+        position = self._old_position(key)
+        if position is None:
+            return
+        data = self.old_value_array[position]
+        self.old_key_array[position] = _MOVED
+        self.old_value_array[position] = None
+        self._place(key, data, home)
+
+    def _migrate(self, slots: int) -> None:
+        """
+        Move the entries of the next slots of the old arrays into the table,
+        dropping the old arrays once all of them have been moved.
+
+        :complexity: O(slots*hash(K)), plus placing the entries.
+        """
+        keys, values = self.old_key_array, self.old_value_array
+        stop = min(self.migrated + slots, len(keys))
+        for position in range(self.migrated, stop):
+            key = keys[position]
+            if key is not None and key is not _MOVED:
+                self._place(key, values[position], self.hash(key))
+        self.migrated = stop
+        if stop == len(keys):
+            self.old_key_array = None
+            self.old_value_array = None
+            self.old_hash_array = None
+
+    def _finish_migration(self) -> None:
+        """
+        Move everything left in the old arrays, if an incremental resize is underway.
+
+        :complexity: O(M + N*hash(K)) where M is the old table size and N the entries left.
+        """
+        if self.old_key_array is not None:
+            self._migrate(len(self.old_key_array))
+
     def keys(self) -> list[K]:
         """
         Returns all keys in the hash table.
 
         :complexity: O(N) where N is self.table_size.
         """
-        res = []
-        for x in range(self.table_size):
-            if self.array[x] is not None:
-                res.append(self.array[x][0])
-        return res
+        return list(self.iter_keys())
 
     def values(self) -> list[V]:
         """
@@ -116,11 +316,81 @@ class LinearProbeTable(Generic[K, V]):
 
         :complexity: O(N) where N is self.table_size.
         """
-        res = []
-        for x in range(self.table_size):
-            if self.array[x] is not None:
-                res.append(self.array[x][1])
-        return res
+        return list(self.iter_values())
+
+    def items(self) -> list[tuple[K, V]]:
+        """
+        Returns all (key, value) pairs in the hash table.
+
+        :complexity: O(N) where N is self.table_size.
+        """
+        return list(self.iter_items())
+
+    def _iter_positions(self) -> Iterator[tuple[int, K]]:
+        """
+        Yield the position and key of every entry, failing fast if the table is modified.
+
+        :complexity: O(N) where N is self.table_size, spread over the iteration.
+        :raises RuntimeError: when the table is modified during iteration.
+        """
+        self._finish_migration()
+        modifications = self.modifications
+        for x, key in enumerate(self.key_array):
+            if self.modifications != modifications:
+                raise RuntimeError("Hash table modified during iteration.")
+            if key is not None:
+                yield x, key
+
+    def iter_keys(self) -> Iterator[K]:
+        """
+        Returns an iterator of all keys in the hash table.
+
+        :complexity: O(1) per step, O(N) overall where N is self.table_size.
+        :raises RuntimeError: when the table is modified during iteration.
+        """
+        for _, key in self._iter_positions():
+            yield key
+
+    def iter_values(self) -> Iterator[V]:
+        """
+        Returns an iterator of all values in the hash table.
+
+        :complexity: O(1) per step, O(N) overall where N is self.table_size.
+        :raises RuntimeError: when the table is modified during iteration.
+        """
+        for x, _ in self._iter_positions():
+            yield self.value_array[x]
+
+    def iter_items(self) -> Iterator[tuple[K, V]]:
+        """
+        Returns an iterator of all (key, value) pairs in the hash table.
+
+        :complexity: O(1) per step, O(N) overall where N is self.table_size.
+        :raises RuntimeError: when the table is modified during iteration.
+        """
+        for x, key in self._iter_positions():
+            yield key, self.value_array[x]
+
+    def __iter__(self) -> Iterator[K]:
+        return self.iter_keys()
+
+    def keys_view(self) -> KeysView[K]:
+        """
+        Returns a live view of the keys, like dict.keys().
+        """
+        return KeysView(self)
+
+    def values_view(self) -> ValuesView[V]:
+        """
+        Returns a live view of the values, like dict.values().
+        """
+        return ValuesView(self)
+
+    def items_view(self) -> ItemsView[K, V]:
+        """
+        Returns a live view of the (key, value) pairs, like dict.items().
+        """
+        return ItemsView(self)
 
     def __contains__(self, key: K) -> bool:
         """
@@ -142,8 +412,24 @@ class LinearProbeTable(Generic[K, V]):
         :complexity: See linear probe.
         :raises KeyError: when the key doesn't exist.
         """
-        position = self._linear_probe(key, False)
-        return self.array[position][1]
+        return self._get(key, self.hash(key))
+
+    def _get(self, key: K, home: int) -> V:
+        """
+        Get the value of a key whose hash is known, from the old arrays if it is still there.
+
+        :complexity: See probe, and old position while migrating.
+        :raises KeyError: when the key doesn't exist.
+        """
+        try:
+            return self.value_array[self._probe(key, home, False)]
+        except KeyError:
+            if self.old_key_array is None:
+                raise
+        position = self._old_position(key)
+        if position is None:
+            raise KeyError(key)
+        return self.old_value_array[position]
 
     def __setitem__(self, key: K, data: V) -> None:
         """
@@ -152,38 +438,164 @@ class LinearProbeTable(Generic[K, V]):
         :complexity: See linear probe.
         :raises FullError: when the table cannot be resized further.
         """
+        self._upsert(key, data, self.hash(key))
+        if self.old_key_array is not None:
+            self._migrate(self.MIGRATE_STEP)
 
-        position = self._linear_probe(key, True)
+        if len(self) > self.table_size * self.MAX_LOAD_FACTOR:
+            self._rehash()
 
-        if self.array[position] is None:
-            self.count += 1
+    def setdefault(self, key: K, default: V) -> V:
+        """
+        Returns the value at key, first setting it to default if the key is missing.
 
-        self.array[position] = (key, data)
+        :complexity: See linear probe.
+        :raises FullError: when the table cannot be resized further.
+        """
+        value = self._upsert(key, default, self.hash(key), False)
+        if self.old_key_array is not None:
+            self._migrate(self.MIGRATE_STEP)
 
-        if len(self) > self.table_size / 2:
+        if len(self) > self.table_size * self.MAX_LOAD_FACTOR:
             self._rehash()
+        return value
+
+    def _upsert(self, key: K, data: V, home: int, replace: bool = True) -> V:
+        """
+        Insert or update a key whose hash is known, without checking the load.
+        With replace unset, the value of a key already in the table is kept.
+
+        :return: The value now at key.
+        :complexity: See probe.
+        :raises FullError: when the table is full.
+        """
+        if self.old_key_array is not None:
+            self._take_old(key, home)
+        position = self._probe(key, home, True)
+
+        if self.key_array[position] is None or self.key_array[position] != key:
+            self.count += 1
+            self.modifications += 1
+            self._insert_at(position, key, data, home)
+        elif replace:
+            self.value_array[position] = data
+        else:
+            return self.value_array[position]
+        return data
 
     def __delitem__(self, key: K) -> None:
         """
         Deletes a (key, value) pair in our hash table.
 
+        Uses backward-shift deletion: walking the rest of the cluster, an
+        entry is moved back into the hole whenever its home slot does not
+        lie between the hole and the entry. The layout ends up exactly as
+        if the cluster had been reinserted, without hashing or probing.
         :complexity best: O(hash(key)) deleting item is not probed and in correct spot.
-        :complexity worst: O(N*hash(key)+N^2*comp(K)) deleting item is midway through large chain.
+        :complexity worst: O(hash(key)+N) deleting item is at the start of a large chain.
         :raises KeyError: when the key doesn't exist.
         """
-        position = self._linear_probe(key, False)
-        # Remove the element
-        self.array[position] = None
+        hole = self._linear_probe(key, False)
         self.count -= 1
-        # Start moving over the cluster
-        position = (position + 1) % self.table_size
-        while self.array[position] is not None:
-            key2, value = self.array[position]
-            self.array[position] = None
-            # Reinsert.
-            newpos = self._linear_probe(key2, True)
-            self.array[newpos] = (key2, value)
-            position = (position + 1) % self.table_size
+        self.modifications += 1
+        self._shift_back(hole)
+        if self.old_key_array is not None:
+            self._migrate(self.MIGRATE_STEP)
+
+        if len(self) < self.table_size * self.MIN_LOAD_FACTOR and self.size_index > 0:
+            self._shrink()
+
+    def _shift_back(self, hole: int) -> None:
+        """
+        Empty the slot at hole, closing the gap by moving later entries of the cluster back.
+
+        :complexity: O(L) where L is the length of the rest of the cluster.
+        """
+        size = self.table_size
+        position = (hole + 1) % size
+        while self.key_array[position] is not None:
+            home = self.hash_array[position]
+            # Distance travelled from home vs. distance back to the hole.
+            if (position - home) % size >= (position - hole) % size:
+                self.key_array[hole] = self.key_array[position]
+                self.value_array[hole] = self.value_array[position]
+                self.hash_array[hole] = home
+                hole = position
+            position = (position + 1) % size
+        self.key_array[hole] = None
+        self.value_array[hole] = None
+
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[K, V]], sizes=None, max_load_factor:float|None=None, min_load_factor:float|None=None, incremental:bool|None=None) -> LinearProbeTable[K, V]:
+        """
+        Build a table from (key, value) pairs, sized for all of them up front.
+
+        Later pairs win over earlier pairs with the same key.
+        :complexity: See update.
+        """
+        table = cls(sizes, max_load_factor, min_load_factor, incremental)
+        table.update(items)
+        return table
+
+    def update(self, items: Iterable[tuple[K, V]]) -> None:
+        """
+        Set many (key, value) pairs at once.
+
+        The table is resized at most once, to the size the pairs would
+        have grown it to if set one at a time, and then every pair is set
+        in a single pass. A batch pays for all of its resize, even when
+        incremental.
+        :complexity best: O(M + N*hash(K)) No probing.
+        :complexity worst: O(M + N*hash(K) + N^2*comp(K)) Lots of probing.
+        Where N is the number of pairs and M the table size after resizing.
+        :raises FullError: when the table cannot be resized further.
+        """
+        if not isinstance(items, (list, tuple)):
+            items = list(items)
+        # Assume every key is new, duplicates only make the table larger than needed.
+        size_index = self.size_index
+        needed = self.count + len(items)
+        while size_index + 1 < len(self.TABLE_SIZES) and needed > self.TABLE_SIZES[size_index] * self.MAX_LOAD_FACTOR:
+            size_index += 1
+        if size_index != self.size_index:
+            self._resize(size_index)
+            self._finish_migration()
+
+        homes = self._hash_many([key for key, _ in items])
+        for (key, data), home in zip(items, homes):
+            self._upsert(key, data, home)
+
+    def get_many(self, keys: Iterable[K]) -> list[V]:
+        """
+        Get the values for many keys, in the same order.
+
+        :complexity: See linear probe, per key.
+        :raises KeyError: when any key doesn't exist.
+        """
+        if not isinstance(keys, (list, tuple)):
+            keys = list(keys)
+        return [self._get(key, home) for key, home in zip(keys, self._hash_many(keys))]
+
+    def delete_many(self, keys: Iterable[K]) -> None:
+        """
+        Delete many keys, shrinking at most once at the end.
+
+        Keys deleted before a missing key stay deleted. Like delete, each
+        deletion moves a step of an incremental migration along.
+        :complexity: See delete, per key, plus at most one resize.
+        :raises KeyError: when any key doesn't exist.
+        """
+        try:
+            for key in keys:
+                hole = self._linear_probe(key, False)
+                self.count -= 1
+                self.modifications += 1
+                self._shift_back(hole)
+                if self.old_key_array is not None:
+                    self._migrate(self.MIGRATE_STEP)
+        finally:
+            if len(self) < self.table_size * self.MIN_LOAD_FACTOR and self.size_index > 0:
+                self._shrink()
 
     def is_empty(self) -> bool:
         return self.count == 0
@@ -195,21 +607,54 @@ class LinearProbeTable(Generic[K, V]):
         """
         Need to resize table and reinsert all values
 
-        :complexity best: O(N*hash(K)) No probing.
-        :complexity worst: O(N*hash(K) + N^2*comp(K)) Lots of probing.
-        Where N is len(self)
+        :complexity: See resize.
         """
-        old_array = self.array
-        self.size_index += 1
-        if self.size_index == len(self.TABLE_SIZES):
+        if self.size_index + 1 == len(self.TABLE_SIZES):
             # Cannot be resized further.
             return
-        self.array = ArrayR(self.TABLE_SIZES[self.size_index])
-        self.count = 0
-        for item in old_array:
-            if item is not None:
-                key, value = item
-                self[key] = value
+        self._resize(self.size_index + 1)
+
+    def _shrink(self) -> None:
+        """
+        Move down to the largest smaller size where the load is no longer under the minimum.
+
+        :complexity: See resize.
+        """
+        size_index = self.size_index - 1
+        while size_index > 0 and len(self) < self.TABLE_SIZES[size_index] * self.MIN_LOAD_FACTOR:
+            size_index -= 1
+        self._resize(size_index)
+
+    def _resize(self, size_index: int) -> None:
+        """
+        Move all entries into new arrays of size TABLE_SIZES[size_index].
+
+        Entries are placed straight into the new arrays: keys are known to
+        be distinct, so no key comparisons or resize checks are needed.
+        The stored hashes are only valid for the old size, so every key is
+        hashed once for the new size, all in one batch.
+        When incremental, the current arrays are kept to be moved over by
+        later writes instead, once any earlier move has been finished.
+        :complexity best: O(N*hash(K) + M) No probing.
+        :complexity worst: O(N*hash(K) + N^2 + M) Lots of probing.
+        Where N is len(self) and M is the old table size.
+        :complexity incremental: O(M') to allocate, where M' is the new table size.
+        """
+        self._finish_migration()
+        if self.INCREMENTAL:
+            self.old_key_array = self.key_array
+            self.old_value_array = self.value_array
+            self.old_hash_array = self.hash_array
+            self.migrated = 0
+            self.size_index = size_index
+            self._allocate(self.TABLE_SIZES[self.size_index])
+            return
+        entries = [(key, value) for key, value in zip(self.key_array, self.value_array) if key is not None]
+        self.size_index = size_index
+        self._allocate(self.TABLE_SIZES[self.size_index])
+        homes = self._hash_many([key for key, _ in entries])
+        for (key, value), home in zip(entries, homes):
+            self._place(key, value, home)
 
     def __str__(self) -> str:
         """
@@ -218,8 +663,170 @@ class LinearProbeTable(Generic[K, V]):
         :complexity: O(N * (str(key) + str(value))) where N is the table size
         """
         result = ""
-        for item in self.array:
-            if item is not None:
-                (key, value) = item
-                result += "(" + str(key) + "," + str(value) + ")\n"
+        for key, value in self.iter_items():
+            result += "(" + str(key) + "," + str(value) + ")\n"
         return result
+
+
+class TableView:
+    """
+    Live view over a LinearProbeTable.
+
+    Nothing is copied: the length and contents always reflect the table
+    as it is now, and iterating while the table is modified raises a
+    RuntimeError.
+    """
+
+    def __init__(self, table: LinearProbeTable) -> None:
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)})"
+
+
+class KeysView(TableView, Generic[K]):
+
+    def __iter__(self) -> Iterator[K]:
+        return self.table.iter_keys()
+
+    def __contains__(self, key: K) -> bool:
+        """
+        :complexity: See linear probe.
+        """
+        return key in self.table
+
+
+class ValuesView(TableView, Generic[V]):
+
+    def __iter__(self) -> Iterator[V]:
+        return self.table.iter_values()
+
+    def __contains__(self, value: V) -> bool:
+        """
+        :complexity: O(N) where N is the table size.
+        """
+        return any(item == value for item in self)
+
+
+class ItemsView(TableView, Generic[K, V]):
+
+    def __iter__(self) -> Iterator[tuple[K, V]]:
+        return self.table.iter_items()
+
+    def __contains__(self, item: tuple[K, V]) -> bool:
+        """
+        :complexity: See linear probe.
+        """
+        key, value = item
+        try:
+            return self.table[key] == value
+        except KeyError:
+            return False
+
+
+class RobinHoodTable(LinearProbeTable[K, V]):
+    """
+    Linear Probe Table using Robin Hood insertion.
+
+    An inserted key takes the slot of any entry that is closer to its own
+    home than the key is, and that entry carries on probing instead.
+    This keeps probe distances even across the table, and lets a lookup
+    stop as soon as it reaches an entry closer to home than the key
+    would be. Probes stay short at higher loads, so by default it only
+    grows once 80% full.
+
+    Distances are not stored separately, they follow from the stored
+    hashes: an entry at position p with home h is (p - h) % table_size
+    slots from home.
+    """
+
+    MAX_LOAD_FACTOR = 0.8
+
+    def _probe(self, key: K, home: int, is_insert: bool) -> int:
+        """
+        Robin Hood probe for a key whose hash is already known.
+
+        When inserting a key that is missing, returns the slot the key
+        should take, which may be held by an entry to displace. Displacing
+        needs a free slot somewhere, so a full table raises instead.
+        :complexity best: O(1) first position is empty
+        :complexity worst: O(D*comp(K)) where D is the longest probe distance in the table.
+        :raises KeyError: When the key is not in the table, but is_insert is False.
+        :raises FullError: When a table is full and cannot be inserted.
+        """
+        size = self.table_size
+        position = home
+
+        for distance in range(size):
+            stored = self.key_array[position]
+            if stored is None or (position - self.hash_array[position]) % size < distance:
+                # Empty, or the key would have displaced this entry. Either way it isn't here.
+                if is_insert:
+                    if stored is not None and self.count >= size:
+                        raise FullError("Table is full!")
+                    return position
+                else:
+                    raise KeyError(key)
+            elif self.hash_array[position] == home and stored == key:
+                return position
+            position = (position + 1) % size
+
+        if is_insert:
+            raise FullError("Table is full!")
+        else:
+            raise KeyError(key)
+
+    def _place(self, key: K, data: V, home: int) -> None:
+        """
+        Put a key known not to be in the table into the table, displacing as needed.
+
+        :complexity best: O(1) home is empty
+        :complexity worst: O(N) where N is the tablesize
+        """
+        self._displace_from(home, key, data, home)
+
+    def _insert_at(self, position: int, key: K, data: V, home: int) -> None:
+        """
+        Store a new key at the position found by an inserting probe, displacing its holder.
+        """
+        self._displace_from(position, key, data, home)
+
+    def _displace_from(self, position: int, key: K, data: V, home: int) -> None:
+        """
+        Robin Hood insertion of an entry, starting at position.
+
+        :complexity: O(L) where L is the length of the rest of the cluster.
+        """
+        size = self.table_size
+        while self.key_array[position] is not None:
+            if (position - self.hash_array[position]) % size < (position - home) % size:
+                # Take from the rich: swap in, and carry the displaced entry on.
+                key, self.key_array[position] = self.key_array[position], key
+                data, self.value_array[position] = self.value_array[position], data
+                home, self.hash_array[position] = self.hash_array[position], home
+            position = (position + 1) % size
+        self.key_array[position] = key
+        self.value_array[position] = data
+        self.hash_array[position] = home
+
+    def _shift_back(self, hole: int) -> None:
+        """
+        Empty the slot at hole, moving the displaced entries after it back by one.
+
+        Clusters are ordered by home slot, so the shift can stop at the
+        first entry already in its home.
+        :complexity: O(L) where L is the length of the rest of the cluster.
+        """
+        size = self.table_size
+        position = (hole + 1) % size
+        while self.key_array[position] is not None and self.hash_array[position] != position:
+            self.key_array[hole] = self.key_array[position]
+            self.value_array[hole] = self.value_array[position]
+            self.hash_array[hole] = self.hash_array[position]
+            hole = position
+            position = (position + 1) % size
+        self.key_array[hole] = None
+        self.value_array[hole] = None
@@ -0,0 +1,140 @@
+""" Polynomial string hashing shared by the hash tables.
+
+`polynomial_hash` gives exactly the value of the per-character loop the
+tables have always used, so table layouts don't change. Results are
+memoised, since the same keys are hashed again and again for the same
+size. The memo is a least recently used cache of (key, table size, base)
+entries, so it keeps at most MEMO_SIZE keys alive, and dropping old
+entries one at a time never empties it during a large rehash.
+
+`polynomial_hash_many` computes the same values for a batch of keys. If
+NumPy is installed, keys are turned into a matrix of code points (longest
+key first) and hashed one character column at a time across all keys
+still long enough, instead of one key at a time.
+"""
+from __future__ import annotations
+__docformat__ = 'reStructuredText'
+
+from collections import OrderedDict
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HASH_BASE = 31
+HASH_START = 31415
+
+# Most (key, table size, base) entries memoised.
+MEMO_SIZE = 1 << 16
+
+# Keys hashed by NumPy at once, bounding the size of the code point matrix.
+BATCH_SIZE = 1 << 14
+
+# Least recently used first.
+_memo: OrderedDict[tuple[str, int, int], int] = OrderedDict()
+
+
+def _recall(key: str, table_size: int, base: int) -> int|None:
+    """
+    Get a memoised hash, marking it as recently used.
+    """
+    entry = (key, table_size, base)
+    value = _memo.get(entry)
+    if value is not None:
+        _memo.move_to_end(entry)
+    return value
+
+
+def _remember(key: str, table_size: int, base: int, value: int) -> None:
+    """
+    Memoise a hash, dropping the least recently used one if the memo is full.
+    """
+    _memo[key, table_size, base] = value
+    if len(_memo) > MEMO_SIZE:
+        _memo.popitem(last=False)
+
+
+def _polynomial_hash(key, table_size: int, base: int) -> int:
+    """
+    The original per-character hash loop.
+
+    :complexity: O(len(key))
+    """
+    value = 0
+    a = HASH_START
+    for char in key:
+        value = (ord(char) + a * value) % table_size
+        a = a * base % (table_size - 1)
+    return value
+
+
+def polynomial_hash(key, table_size: int, base: int = HASH_BASE) -> int:
+    """
+    Hash a key for a table of the given size.
+
+    :complexity best: O(1) key already memoised for this size.
+    :complexity worst: O(len(key))
+    """
+    if type(key) is not str:
+        return _polynomial_hash(key, table_size, base)
+    value = _recall(key, table_size, base)
+    if value is None:
+        value = _polynomial_hash(key, table_size, base)
+        _remember(key, table_size, base, value)
+    return value
+
+
+def polynomial_hash_many(keys: Sequence, table_size: int, base: int = HASH_BASE) -> list[int]:
+    """
+    Hash many keys for a table of the given size, in the same order.
+
+    :complexity: O(N*L) where N is len(keys) and L the length of the longest
+        key not yet memoised, with the L factor in NumPy when installed.
+    """
+    if np is None or table_size >= 1 << 31 or any(type(key) is not str for key in keys):
+        return [polynomial_hash(key, table_size, base) for key in keys]
+
+    res = [_recall(key, table_size, base) for key in keys]
+    missing = [i for i in range(len(res)) if res[i] is None]
+    for start in range(0, len(missing), BATCH_SIZE):
+        batch = missing[start:start + BATCH_SIZE]
+        values = _hash_batch([keys[i] for i in batch], table_size, base)
+        for i, value in zip(batch, values):
+            res[i] = value
+            _remember(keys[i], table_size, base, value)
+    return res
+
+
+def _hash_batch(keys: list[str], table_size: int, base: int) -> list[int]:
+    """
+    Vectorised polynomial hash of a batch of strings.
+
+    Keys are sorted longest first, so the keys still being hashed at
+    column c are always a prefix of the rows.
+    Values stay under 2**31 and so do the multipliers, so int64 never
+    overflows.
+    """
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+    order = np.argsort(-lengths, kind="stable")
+    lengths = lengths[order]
+    longest = int(lengths[0]) if len(keys) else 0
+    if longest == 0:
+        return [0] * len(keys)
+    # Fixed width unicode is UTF-32, so viewing it as uint32 gives code points.
+    codes = np.array([keys[i] for i in order], dtype=f"<U{longest}")
+    points = codes.view(np.uint32).reshape(len(keys), longest)
+
+    value = np.zeros(len(keys), dtype=np.int64)
+    # Number of keys longer than each column.
+    active = np.searchsorted(-lengths, -np.arange(longest), side="left")
+    a = HASH_START
+    for column in range(longest):
+        rows = active[column]
+        value[:rows] = (points[:rows, column] + a * value[:rows]) % table_size
+        a = a * base % (table_size - 1)
+
+    res = np.empty_like(value)
+    res[order] = value
+    return res.tolist()
@@ -11,8 +11,12 @@ class Node(Generic[T]):
         Attributes:
             item (T): the data to be stored by the node
             link (Node[T]): reference to the next node
+
+        Nodes have no __dict__, only slots for these two attributes.
     """
 
+    __slots__ = ('item', 'link')
+
     def __init__(self, item: T = None) -> None:
         """ Object initializer. """
         self.item = item
@@ -12,12 +12,27 @@ space to hold the references.
 Note that while I do check the precondition in __init__ (noone else
 would), I do not check that of getitem or setitem, since that is already
 checked by self.array[index].
+
+The space comes back from ctypes as NULL pointers, which cannot be read.
+Rather than assigning None to every slot from a Python list of the full
+length, slot 0 is set to None and that pointer is copied over the rest
+of the array with memmove, doubling the filled prefix each time. This is
+what assigning None does anyway: ctypes keeps no reference for None.
+
+ctypes does keep a reference to every other object stored (in the
+array's _objects), and storing None over it does not drop that
+reference. setitem drops it itself, so removed items can be freed.
+
+Slices, copy_from, fill and iteration all go through ctypes' own slice
+assignment and sequence iteration, so they run in C rather than making
+a Python call per slot.
 """
+from __future__ import annotations
 __author__ = "Julian Garcia for the __init__ code, Maria Garcia de la Banda for the rest"
 __docformat__ = 'reStructuredText'
 
-from ctypes import py_object
-from typing import TypeVar, Generic
+from ctypes import py_object, addressof, memmove, sizeof
+from typing import TypeVar, Generic, Iterable, Iterator
 
 T = TypeVar('T')
 
@@ -25,13 +40,21 @@ T = TypeVar('T')
 class ArrayR(Generic[T]):
     def __init__(self, length: int) -> None:
         """ Creates an array of references to objects of the given length
-        :complexity: O(length) for best/worst case to initialise to None
+        :complexity: O(length) for best/worst case to initialise to None,
+            in O(log(length)) calls to memmove
         :pre: length > 0
         """
         if length <= 0:
             raise ValueError("Array length should be larger than 0.")
         self.array = (length * py_object)() # initialises the space
-        self.array[:] =  [None for _ in range(length)]
+        self.array[0] = None
+        start = addressof(self.array)
+        width = sizeof(py_object)
+        filled = 1
+        while filled < length:
+            chunk = min(filled, length - filled)
+            memmove(start + filled * width, start, chunk * width)
+            filled += chunk
 
     def __len__(self) -> int:
         """ Returns the length of the array
@@ -39,17 +62,66 @@ class ArrayR(Generic[T]):
         """
         return len(self.array)
 
-    def __getitem__(self, index: int) -> T:
-        """ Returns the object in position index.
-        :complexity: O(1)
+    def __getitem__(self, index: int|slice) -> T|list[T]:
+        """ Returns the object in position index, or a list of the objects in a slice.
+        :complexity: O(1), O(length of slice) for a slice
         :pre: index in between 0 and length - self.array[] checks it
         """
         return self.array[index]
 
-    def __setitem__(self, index: int, value: T) -> None:
-        """ Sets the object in position index to value
-        :complexity: O(1)
+    def __setitem__(self, index: int|slice, value: T|Iterable[T]) -> None:
+        """ Sets the object in position index to value,
+        or the objects in a slice to those in value.
+        :complexity: O(1), O(length of slice) for a slice
         :pre: index in between 0 and length - self.array[] checks it
+        :raises ValueError: when value is not the same length as the slice.
         """
+        if isinstance(index, slice):
+            if not isinstance(value, list):
+                value = list(value)
+            self.array[index] = value
+            if None in value and self.array._objects:
+                positions = range(*index.indices(len(self.array)))
+                self._release(positions[i] for i in range(len(value)) if value[i] is None)
+            return
         self.array[index] = value
+        if value is None and self.array._objects:
+            # Release what was stored here before.
+            self.array._objects.pop(format(index % len(self.array), "x"), None)
+
+    def _release(self, positions: Iterable[int]) -> None:
+        """ Drop ctypes' references for positions that now hold None. """
+        objects = self.array._objects
+        for i in positions:
+            objects.pop(format(i, "x"), None)
+
+    def __iter__(self) -> Iterator[T]:
+        """ Iterates over the objects in order.
+        :complexity: O(1) per step
+        """
+        return iter(self.array)
+
+    def copy_from(self, other: ArrayR[T], src: int, dst: int, n: int) -> None:
+        """ Copies the n objects starting at other[src] into this array starting at self[dst].
+        Copying within the same array is fine, even when the ranges overlap.
+        :complexity: O(n)
+        :raises IndexError: when either range does not fit in its array.
+        """
+        if n < 0 or src < 0 or dst < 0 or src + n > len(other) or dst + n > len(self):
+            raise IndexError("Copy range out of bounds.")
+        self[dst:dst + n] = other.array[src:src + n]
+
+    def fill(self, value: T, start: int = 0, stop: int|None = None) -> None:
+        """ Sets every position from start up to (not including) stop to value.
+        :complexity: O(stop - start)
+        """
+        start, stop, _ = slice(start, stop).indices(len(self.array))
+        if start >= stop:
+            return
+        self.array[start:stop] = [value] * (stop - start)
+        if value is None and self.array._objects:
+            if stop - start == len(self.array):
+                self.array._objects.clear()
+            else:
+                self._release(range(start, stop))
 
@@ -8,6 +8,7 @@ __docformat__ = 'reStructuredText'
 
 from abc import ABC, abstractmethod
 from typing import TypeVar, Generic
+from data_structures.referential_array import ArrayR
 T = TypeVar('T')
 
 
@@ -48,3 +49,77 @@ class Stack(ABC, Generic[T]):
     def clear(self):
         """ Clears all elements from the stack. """
         self.length = 0
+
+
+class ArrayStack(Stack[T]):
+    """ Implementation of a stack with an array that doubles when it fills up.
+
+        Attributes:
+            length (int): number of elements in the stack (inherited)
+            array (ArrayR[T]): array storing the elements of the stack
+
+        The array never shrinks, so a stack reused across traversals keeps
+        its space instead of allocating it again.
+
+        Pushes allocate no node, so the garbage collector has less to track,
+        but ctypes keeps a reference entry for every item stored, so pushes
+        and pops are slower than LinkedStack's and use more memory (see
+        benchmarks/bench_stacks.py). Prefer LinkedStack unless GC pauses
+        matter more than throughput.
+    """
+
+    MIN_CAPACITY = 1
+
+    def __init__(self, initial_capacity: int = 1) -> None:
+        """ Object initializer. """
+        Stack.__init__(self)
+        self.array: ArrayR[T] = ArrayR(max(self.MIN_CAPACITY, initial_capacity))
+
+    def clear(self) -> None:
+        """ Resets the stack, releasing the elements.
+            :complexity: O(N) where N is the length of the stack
+        """
+        self.array.fill(None, 0, self.length)
+        super().clear()
+
+    def is_full(self) -> bool:
+        """ Returns whether the stack is full
+            :complexity: O(1)
+        """
+        return False
+
+    def push(self, item: T) -> None:
+        """ Pushes an element to the top of the stack.
+            :complexity best: O(1) there is space left in the array.
+            :complexity worst: O(N) the array is full and doubles, where N is the length of the stack.
+                Amortised over a sequence of pushes, this is O(1).
+        """
+        if self.length == len(self.array):
+            new_array = ArrayR(2 * len(self.array))
+            new_array.copy_from(self.array, 0, 0, self.length)
+            self.array = new_array
+        self.array[self.length] = item
+        self.length += 1
+
+    def pop(self) -> T:
+        """ Pops the element at the top of the stack.
+            :pre: stack is not empty
+            :complexity: O(1)
+            :raises Exception: if the stack is empty
+        """
+        if self.is_empty():
+            raise Exception('Stack is empty')
+        self.length -= 1
+        item = self.array[self.length]
+        self.array[self.length] = None
+        return item
+
+    def peek(self) -> T:
+        """ Returns the element at the top, without popping it from stack.
+            :pre: stack is not empty
+            :complexity: O(1)
+            :raises Exception: if the stack is empty
+        """
+        if self.is_empty():
+            raise Exception('Stack is empty')
+        return self.array[self.length - 1]
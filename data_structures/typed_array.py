@@ -0,0 +1,71 @@
+""" Arrays of machine numbers, for numeric payloads such as stored hashes or positions.
+
+ArrayR stores a pointer to a Python object in every slot, and ctypes
+keeps a reference to each stored object on top of that. A TypedArray
+stores the numbers themselves in an `array.array` buffer: 8 bytes per
+slot and no object per element.
+
+The buffer supports the buffer protocol, so NumPy can work on it
+without copying through `numpy.frombuffer(typed.array, ...)`.
+"""
+from __future__ import annotations
+__docformat__ = 'reStructuredText'
+
+from array import array
+from typing import TypeVar, Generic
+
+T = TypeVar('T', int, float)
+
+
+class TypedArray(Generic[T]):
+    """
+    Fixed length array of numbers of a single `array` typecode.
+
+    Unlike ArrayR, slots start at `fill` (0 by default) rather than None,
+    and None cannot be stored.
+    """
+
+    TYPECODE = 'q'
+
+    def __init__(self, length: int, fill: T = 0) -> None:
+        """ Creates an array of the given length with every slot set to fill.
+        :complexity: O(length), repeating a one element buffer in C.
+        :pre: length > 0
+        """
+        if length <= 0:
+            raise ValueError("Array length should be larger than 0.")
+        self.array = array(self.TYPECODE, [fill]) * length
+
+    def __len__(self) -> int:
+        """ Returns the length of the array
+        :complexity: O(1)
+        """
+        return len(self.array)
+
+    def __getitem__(self, index: int) -> T:
+        """ Returns the number in position index.
+        :complexity: O(1)
+        :pre: index in between 0 and length - self.array[] checks it
+        """
+        return self.array[index]
+
+    def __setitem__(self, index: int, value: T) -> None:
+        """ Sets the number in position index to value
+        :complexity: O(1)
+        :pre: index in between 0 and length - self.array[] checks it
+        :raises TypeError: when value is not a number of this array's type.
+        :raises OverflowError: when value does not fit in this array's type.
+        """
+        self.array[index] = value
+
+
+class IntArray(TypedArray[int]):
+    """ Array of signed 64-bit integers. """
+
+    TYPECODE = 'q'
+
+
+class FloatArray(TypedArray[float]):
+    """ Array of double precision floats. """
+
+    TYPECODE = 'd'
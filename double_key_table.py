@@ -1,16 +1,131 @@
 from __future__ import annotations
 
-from typing import Generic, TypeVar, Iterator
-from data_structures.hash_table import LinearProbeTable, FullError
+from abc import ABC, abstractmethod
+from typing import Generic, TypeVar, Iterable, Iterator
+from data_structures.hash_table import LinearProbeTable, RobinHoodTable, FullError
 from data_structures.referential_array import ArrayR
+from data_structures.hashing import polynomial_hash, polynomial_hash_many
 
 K1 = TypeVar('K1')
 K2 = TypeVar('K2')
 V = TypeVar('V')
 
-class DoubleKeyTable(Generic[K1, K2, V]):
+class SingleEntryTable(Generic[K2, V]):
     """
-    Double Hash Table.
+    Bottom-level table holding at most one entry, in place of a LinearProbeTable.
+
+    Has the parts of the LinearProbeTable API that DoubleKeyTable uses.
+    Like a full table that cannot grow, setting a second key raises FullError.
+    """
+
+    __slots__ = ('key', 'value', 'modifications')
+
+    def __init__(self) -> None:
+        self.key: K2|None = None
+        self.value: V|None = None
+        self.modifications = 0
+
+    @property
+    def table_size(self) -> int:
+        return 1
+
+    def __len__(self) -> int:
+        return 0 if self.key is None else 1
+
+    def is_empty(self) -> bool:
+        return self.key is None
+
+    def is_full(self) -> bool:
+        return self.key is not None
+
+    def _linear_probe(self, key: K2, is_insert: bool) -> int:
+        """
+        :raises KeyError: When the key is not in the table, but is_insert is False.
+        :raises FullError: When inserting a new key into a full table.
+        """
+        if self.key is not None and self.key == key:
+            return 0
+        if not is_insert:
+            raise KeyError(key)
+        if self.key is not None:
+            raise FullError("Table is full!")
+        return 0
+
+    def __contains__(self, key: K2) -> bool:
+        return self.key is not None and self.key == key
+
+    def __getitem__(self, key: K2) -> V:
+        """
+        :raises KeyError: when the key doesn't exist.
+        """
+        self._linear_probe(key, False)
+        return self.value
+
+    def __setitem__(self, key: K2, data: V) -> None:
+        """
+        :raises FullError: when another key is already set.
+        """
+        self._linear_probe(key, True)
+        if self.key is None:
+            self.key = key
+            self.modifications += 1
+        self.value = data
+
+    def __delitem__(self, key: K2) -> None:
+        """
+        :raises KeyError: when the key doesn't exist.
+        """
+        self._linear_probe(key, False)
+        self.key = None
+        self.value = None
+        self.modifications += 1
+
+    def update(self, items: Iterable[tuple[K2, V]]) -> None:
+        """
+        :raises FullError: when the pairs hold more than one key between them and the table.
+        """
+        for key, data in items:
+            self[key] = data
+
+    def get_many(self, keys: Iterable[K2]) -> list[V]:
+        """
+        :raises KeyError: when any key doesn't exist.
+        """
+        return [self[key] for key in keys]
+
+    def items(self) -> list[tuple[K2, V]]:
+        return list(self.iter_items())
+
+    def keys(self) -> list[K2]:
+        return [key for key, _ in self.iter_items()]
+
+    def values(self) -> list[V]:
+        return [value for _, value in self.iter_items()]
+
+    def iter_items(self) -> Iterator[tuple[K2, V]]:
+        """
+        Yields the entry, if any, when first asked.
+
+        :raises RuntimeError: when the table is modified during iteration.
+        """
+        modifications = self.modifications
+        if self.key is not None:
+            yield self.key, self.value
+        if self.modifications != modifications:
+            raise RuntimeError("Hash table modified during iteration.")
+
+    def iter_keys(self) -> Iterator[K2]:
+        for key, _ in self.iter_items():
+            yield key
+
+    def iter_values(self) -> Iterator[V]:
+        for _, value in self.iter_items():
+            yield value
+
+
+class DoubleKeyTableADT(ABC, Generic[K1, K2, V]):
+    """
+    Abstract Double Hash Table, keyed on (key1, key2) pairs.
 
     Type Arguments:
         - K1:   1st Key Type. In most cases should be string.
@@ -19,7 +134,8 @@ class DoubleKeyTable(Generic[K1, K2, V]):
                 Otherwise `hash2` should be overwritten.
         - V:    Value Type.
 
-    Unless stated otherwise, all methods have O(1) complexity.
+    Defines the API shared by DoubleKeyTable and FlatDoubleKeyTable, with
+    the hashes and the methods that only need that API.
     """
 
     # No test case should exceed 1 million entries.
@@ -27,46 +143,29 @@ class DoubleKeyTable(Generic[K1, K2, V]):
 
     HASH_BASE = 31
 
-    def __init__(self, sizes:list|None=None, internal_sizes:list|None=None) -> None:
-        raise NotImplementedError()
+    def __init__(self, sizes:list|None=None) -> None:
+        """ Object initializer. """
+        if sizes is not None:
+            self.TABLE_SIZES = sizes
+        self.count = 0
 
     def hash1(self, key: K1) -> int:
         """
         Hash the 1st key for insert/retrieve/update into the hashtable.
 
-        :complexity: O(len(key))
+        :complexity: O(len(key)), O(1) if recently hashed for this size.
         """
-
-        value = 0
-        a = 31415
-        for char in key:
-            value = (ord(char) + a * value) % self.table_size
-            a = a * self.HASH_BASE % (self.table_size - 1)
-        return value
+        return polynomial_hash(key, self.table_size, self.HASH_BASE)
 
     def hash2(self, key: K2, sub_table: LinearProbeTable[K2, V]) -> int:
         """
         Hash the 2nd key for insert/retrieve/update into the hashtable.
 
-        :complexity: O(len(key))
+        :complexity: O(len(key)), O(1) if recently hashed for this size.
         """
+        return polynomial_hash(key, sub_table.table_size, self.HASH_BASE)
 
-        value = 0
-        a = 31415
-        for char in key:
-            value = (ord(char) + a * value) % sub_table.table_size
-            a = a * self.HASH_BASE % (sub_table.table_size - 1)
-        return value
-
-    def _linear_probe(self, key1: K1, key2: K2, is_insert: bool) -> tuple[int, int]:
-        """
-        Find the correct position for this key in the hash table using linear probing.
-
-        :raises KeyError: When the key pair is not in the table, but is_insert is False.
-        :raises FullError: When a table is full and cannot be inserted.
-        """
-        raise NotImplementedError()
-
+    @abstractmethod
     def iter_keys(self, key:K1|None=None) -> Iterator[K1|K2]:
         """
         key = None:
@@ -74,15 +173,17 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         key = k:
             Returns an iterator of all keys in the bottom-hash-table for k.
         """
-        raise NotImplementedError()
+        pass
 
+    @abstractmethod
     def keys(self, key:K1|None=None) -> list[K1]:
         """
         key = None: returns all top-level keys in the table.
         key = x: returns all bottom-level keys for top-level key x.
         """
-        raise NotImplementedError()
+        pass
 
+    @abstractmethod
     def iter_values(self, key:K1|None=None) -> Iterator[V]:
         """
         key = None:
@@ -90,14 +191,15 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         key = k:
             Returns an iterator of all values in the bottom-hash-table for k.
         """
-        raise NotImplementedError()
+        pass
 
+    @abstractmethod
     def values(self, key:K1|None=None) -> list[V]:
         """
         key = None: returns all values in the table.
         key = x: returns all values for top-level key x.
         """
-        raise NotImplementedError()
+        pass
 
     def __contains__(self, key: tuple[K1, K2]) -> bool:
         """
@@ -112,28 +214,320 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         else:
             return True
 
+    @abstractmethod
+    def __getitem__(self, key: tuple[K1, K2]) -> V:
+        """
+        Get the value at a certain key
+
+        :raises KeyError: when the key doesn't exist.
+        """
+        pass
+
+    @abstractmethod
+    def __setitem__(self, key: tuple[K1, K2], data: V) -> None:
+        """ Set an (key, value) pair in our hash table. """
+        pass
+
+    def set_many(self, items: Iterable[tuple[tuple[K1, K2], V]]) -> None:
+        """
+        Set many ((key1, key2), value) pairs, one at a time.
+
+        :complexity: See setitem, per pair.
+        """
+        for key, data in items:
+            self[key] = data
+
+    def get_many(self, keys: Iterable[tuple[K1, K2]]) -> list[V]:
+        """
+        Get the values for many (key1, key2) pairs, in the same order.
+
+        :complexity: See getitem, per pair.
+        :raises KeyError: when any key doesn't exist.
+        """
+        return [self[key] for key in keys]
+
+    @abstractmethod
+    def __delitem__(self, key: tuple[K1, K2]) -> None:
+        """
+        Deletes a (key, value) pair in our hash table.
+
+        :raises KeyError: when the key doesn't exist.
+        """
+        pass
+
+    @abstractmethod
+    def _rehash(self) -> None:
+        """ Need to resize table and reinsert all values """
+        pass
+
+    @property
+    @abstractmethod
+    def table_size(self) -> int:
+        """
+        Return the current size of the table (different from the length)
+        """
+        pass
+
+    def __len__(self) -> int:
+        """
+        Returns number of elements in the hash table
+        """
+        return self.count
+
+    def __str__(self) -> str:
+        """
+        String representation.
+
+        Not required but may be a good testing tool.
+        :complexity: O(N * (str(key) + str(value))) over all pairs.
+        """
+        result = ""
+        for key1 in self.iter_keys():
+            for key2 in self.iter_keys(key1):
+                result += "(" + str(key1) + "," + str(key2) + "," + str(self[key1, key2]) + ")\n"
+        return result
+
+class DoubleKeyTable(DoubleKeyTableADT[K1, K2, V]):
+    """
+    Double Hash Table.
+
+    The top-level table maps each 1st key to its own table of 2nd keys.
+    With robin_hood set, both levels use Robin Hood insertion, and with
+    incremental set, both levels resize incrementally (see LinearProbeTable).
+
+    With lazy_inner set, a new 1st key starts with a SingleEntryTable, only
+    replaced by a real table when it gets a second 2nd key. Real tables
+    emptied by deletes (and never resized) are kept, up to FREE_TABLES of
+    them, to be used again instead of allocating new ones.
+
+    Unless stated otherwise, all methods have O(1) complexity.
+    """
+
+    # Most emptied bottom-level tables kept for reuse, with lazy_inner.
+    FREE_TABLES = 64
+
+    def __init__(self, sizes:list|None=None, internal_sizes:list|None=None, robin_hood:bool=False, incremental:bool=False, lazy_inner:bool=False) -> None:
+        DoubleKeyTableADT.__init__(self, sizes)
+        self.internal_sizes = internal_sizes
+        self.table_type = RobinHoodTable if robin_hood else LinearProbeTable
+        self.incremental = incremental
+        self.lazy_inner = lazy_inner
+        self.free_tables: list[LinearProbeTable[K2, V]] = []
+        self.top_table: LinearProbeTable[K1, LinearProbeTable[K2, V]] = self.table_type(self.TABLE_SIZES, incremental=incremental)
+        # Looked up on every call, so hash1 can be overwritten after creation.
+        self.top_table.hash = lambda k: self.hash1(k)
+
+    def _new_sub_table(self) -> LinearProbeTable[K2, V]:
+        """
+        Create an empty bottom-level table, hashing with hash2.
+        A free table is used instead if there is one.
+        """
+        if self.free_tables:
+            return self.free_tables.pop()
+        sub_table = self.table_type(self.internal_sizes, incremental=self.incremental)
+        sub_table.hash = lambda k: self.hash2(k, sub_table)
+        sub_table._hash_many = lambda keys: self._hash2_many(keys, sub_table)
+        return sub_table
+
+    def _free_sub_table(self, sub_table: LinearProbeTable[K2, V]|SingleEntryTable[K2, V]) -> None:
+        """
+        Keep an emptied bottom-level table for reuse, if it is a real table
+        still at its first size and the free list isn't full.
+        """
+        if (
+            self.lazy_inner
+            and isinstance(sub_table, LinearProbeTable)
+            and sub_table.size_index == 0
+            and len(self.free_tables) < self.FREE_TABLES
+        ):
+            self.free_tables.append(sub_table)
+
+    def _hash2_many(self, keys: list[K2], sub_table: LinearProbeTable[K2, V]) -> list[int]:
+        """
+        Hash many 2nd keys at once, unless `hash2` has been overwritten.
+
+        :complexity: See polynomial_hash_many.
+        """
+        if "hash2" in self.__dict__ or type(self).hash2 is not DoubleKeyTableADT.hash2:
+            return [self.hash2(key, sub_table) for key in keys]
+        return polynomial_hash_many(keys, sub_table.table_size, self.HASH_BASE)
+
+    def _top_position(self, key1: K1, is_insert: bool) -> int:
+        """
+        Find the position of a 1st key in the top-level table.
+
+        When inserting a new 1st key, its bottom-level table is created.
+        :complexity: See linear probe.
+        :raises KeyError: When the key is not in the table, but is_insert is False.
+        """
+        try:
+            return self.top_table._linear_probe(key1, False)
+        except KeyError:
+            if not is_insert:
+                raise
+            # May resize the top-level table, so probe again afterwards.
+            self.top_table[key1] = SingleEntryTable() if self.lazy_inner else self._new_sub_table()
+            return self.top_table._linear_probe(key1, False)
+
+    def _replace_single(self, top_position: int) -> LinearProbeTable[K2, V]:
+        """
+        Replace the SingleEntryTable at top_position by a real table holding its entry.
+        """
+        single = self.top_table.value_array[top_position]
+        sub_table = self._new_sub_table()
+        if single.is_full():
+            sub_table[single.key] = single.value
+        self.top_table.value_array[top_position] = sub_table
+        return sub_table
+
+    def _linear_probe(self, key1: K1, key2: K2, is_insert: bool) -> tuple[int, int]:
+        """
+        Find the correct position for this key in the hash table using linear probing.
+
+        When inserting a new 1st key, its bottom-level table is created.
+        When inserting a second 2nd key into a SingleEntryTable, it is
+        replaced by a real table holding its entry.
+
+        :complexity: See linear probe on both levels.
+        :raises KeyError: When the key pair is not in the table, but is_insert is False.
+        :raises FullError: When a table is full and cannot be inserted.
+        """
+        top_position = self._top_position(key1, is_insert)
+        sub_table = self.top_table.value_array[top_position]
+        if is_insert and isinstance(sub_table, SingleEntryTable) and sub_table.is_full() and key2 not in sub_table:
+            sub_table = self._replace_single(top_position)
+        return top_position, sub_table._linear_probe(key2, is_insert)
+
+    def iter_keys(self, key:K1|None=None) -> Iterator[K1|K2]:
+        """
+        key = None:
+            Returns an iterator of all top-level keys in hash table
+        key = k:
+            Returns an iterator of all keys in the bottom-hash-table for k.
+        """
+        table = self.top_table if key is None else self.top_table[key]
+        return table.iter_keys()
+
+    def keys(self, key:K1|None=None) -> list[K1]:
+        """
+        key = None: returns all top-level keys in the table.
+        key = x: returns all bottom-level keys for top-level key x.
+        """
+        if key is None:
+            return self.top_table.keys()
+        return self.top_table[key].keys()
+
+    def iter_values(self, key:K1|None=None) -> Iterator[V]:
+        """
+        key = None:
+            Returns an iterator of all values in hash table
+        key = k:
+            Returns an iterator of all values in the bottom-hash-table for k.
+        """
+        if key is not None:
+            return self.top_table[key].iter_values()
+        return (value for sub_table in self.top_table.iter_values() for value in sub_table.iter_values())
+
+    def values(self, key:K1|None=None) -> list[V]:
+        """
+        key = None: returns all values in the table.
+        key = x: returns all values for top-level key x.
+        """
+        if key is None:
+            res = []
+            for sub_table in self.top_table.values():
+                res.extend(sub_table.values())
+            return res
+        return self.top_table[key].values()
+
     def __getitem__(self, key: tuple[K1, K2]) -> V:
         """
         Get the value at a certain key
 
+        :complexity: See linear probe.
         :raises KeyError: when the key doesn't exist.
         """
-        raise NotImplementedError()
+        key1, key2 = key
+        return self.top_table[key1][key2]
 
     def __setitem__(self, key: tuple[K1, K2], data: V) -> None:
         """
         Set an (key, value) pair in our hash table.
+
+        :complexity: See linear probe.
+        """
+        key1, key2 = key
+        top_position, _ = self._linear_probe(key1, key2, True)
+        sub_table = self.top_table.value_array[top_position]
+        size_before = len(sub_table)
+        sub_table[key2] = data
+        self.count += len(sub_table) - size_before
+
+    def set_many(self, items: Iterable[tuple[tuple[K1, K2], V]]) -> None:
+        """
+        Set many ((key1, key2), value) pairs at once.
+
+        Pairs are grouped by 1st key, so each 1st key is probed once and
+        its bottom-level table gets all of its pairs in one update, with
+        the 2nd keys hashed together. Later pairs win over earlier pairs
+        with the same keys.
+        :complexity: See linear probe per 1st key, plus update per group.
         """
+        groups: dict[K1, list[tuple[K2, V]]] = {}
+        for (key1, key2), data in items:
+            groups.setdefault(key1, []).append((key2, data))
+        for key1, group in groups.items():
+            top_position = self._top_position(key1, True)
+            sub_table = self.top_table.value_array[top_position]
+            if isinstance(sub_table, SingleEntryTable) and len({key2 for key2, _ in group} | set(sub_table.keys())) > 1:
+                sub_table = self._replace_single(top_position)
+            size_before = len(sub_table)
+            sub_table.update(group)
+            self.count += len(sub_table) - size_before
+
+    def get_many(self, keys: Iterable[tuple[K1, K2]]) -> list[V]:
+        """
+        Get the values for many (key1, key2) pairs, in the same order.
 
-        raise NotImplementedError()
+        Pairs are grouped by 1st key, so each 1st key is looked up once and
+        its 2nd keys are hashed together.
+        :complexity: See linear probe per 1st key, plus get_many per group.
+        :raises KeyError: when any key doesn't exist.
+        """
+        if not isinstance(keys, (list, tuple)):
+            keys = list(keys)
+        # 1st key -> indices of its pairs in keys
+        groups: dict[K1, list[int]] = {}
+        for index, (key1, _) in enumerate(keys):
+            indices = groups.get(key1)
+            if indices is None:
+                groups[key1] = [index]
+            else:
+                indices.append(index)
+        res = [None] * len(keys)
+        for sub_table, indices in zip(self.top_table.get_many(list(groups)), groups.values()):
+            if len(indices) == 1:
+                res[indices[0]] = sub_table[keys[indices[0]][1]]
+                continue
+            for index, value in zip(indices, sub_table.get_many([keys[index][1] for index in indices])):
+                res[index] = value
+        return res
 
     def __delitem__(self, key: tuple[K1, K2]) -> None:
         """
         Deletes a (key, value) pair in our hash table.
 
+        A 1st key whose bottom-level table becomes empty is removed too.
+        :complexity: See delete on both levels.
         :raises KeyError: when the key doesn't exist.
         """
-        raise NotImplementedError()
+        key1, key2 = key
+        sub_table = self.top_table[key1]
+        del sub_table[key2]
+        self.count -= 1
+        if sub_table.is_empty():
+            del self.top_table[key1]
+            self._free_sub_table(sub_table)
 
     def _rehash(self) -> None:
         """
@@ -141,26 +535,220 @@ class DoubleKeyTable(Generic[K1, K2, V]):
 
         :complexity best: O(N*hash(K)) No probing.
         :complexity worst: O(N*hash(K) + N^2*comp(K)) Lots of probing.
-        Where N is len(self)
+        Where N is the number of top-level keys.
+        :complexity incremental: O(M) to allocate, where M is the new table size.
         """
-        raise NotImplementedError()
+        self.top_table._rehash()
 
+    @property
     def table_size(self) -> int:
         """
         Return the current size of the table (different from the length)
         """
-        raise NotImplementedError()
-
-    def __len__(self) -> int:
-        """
-        Returns number of elements in the hash table
-        """
-        raise NotImplementedError()
+        return self.top_table.table_size
 
     def __str__(self) -> str:
         """
         String representation.
 
         Not required but may be a good testing tool.
+        :complexity: O(N * (str(key) + str(value))) summed over both levels.
+        """
+        result = ""
+        for key1 in self.iter_keys():
+            sub_table = self.top_table[key1]
+            for key2 in self.iter_keys(key1):
+                result += "(" + str(key1) + "," + str(key2) + "," + str(sub_table[key2]) + ")\n"
+        return result
+
+class FlatDoubleKeyTable(DoubleKeyTableADT[K1, K2, V]):
+    """
+    Double Hash Table with every pair in one flat table, keyed on (key1, key2).
+
+    An index table maps each 1st key to the list of its 2nd keys, for
+    keys(k) and values(k). So a 1st key costs an index entry and a list,
+    rather than a whole table of its own. The flat table stores each value
+    with the position of its 2nd key in that list, so a delete can move the
+    last 2nd key into the gap instead of searching the list. 2nd keys are
+    in insertion order until a delete moves one.
+
+    Same public API as DoubleKeyTable. hash1 hashes 1st keys into the index
+    (whose size is table_size). Pairs are hashed by hash_pair, which combines
+    hash1 and hash2 for the flat table, so overwriting them works as for
+    DoubleKeyTable. internal_sizes and lazy_inner are accepted but unused,
+    as there are no inner tables.
+    """
+
+    # Set while hash_pair calls hash1, so table_size is the flat table's size.
+    _hashing_pairs = False
+
+    def __init__(self, sizes:list|None=None, internal_sizes:list|None=None, robin_hood:bool=False, incremental:bool=False, lazy_inner:bool=False) -> None:
+        DoubleKeyTableADT.__init__(self, sizes)
+        self.internal_sizes = internal_sizes
+        self.table_type = RobinHoodTable if robin_hood else LinearProbeTable
+        self.incremental = incremental
+        self.lazy_inner = lazy_inner
+        # (key1, key2) -> (value, position of key2 in the index list of key1)
+        self.table: LinearProbeTable[tuple[K1, K2], tuple[V, int]] = self.table_type(self.TABLE_SIZES, incremental=incremental)
+        self.table.hash = lambda key: self.hash_pair(key)
+        self.index: LinearProbeTable[K1, list[K2]] = self.table_type(self.TABLE_SIZES, incremental=incremental)
+        self.index.hash = lambda k: self.hash1(k)
+
+    def hash_pair(self, key: tuple[K1, K2]) -> int:
+        """
+        Hash a key pair into the flat table, with hash1 and hash2 for its size.
+
+        :complexity: O(len(key1) + len(key2)), O(1) if recently hashed for this size.
+        """
+        key1, key2 = key
+        self._hashing_pairs = True
+        try:
+            hash1 = self.hash1(key1)
+        finally:
+            self._hashing_pairs = False
+        return (hash1 * self.HASH_BASE + self.hash2(key2, self.table)) % self.table.table_size
+
+    def iter_keys(self, key:K1|None=None) -> Iterator[K1|K2]:
+        """
+        key = None:
+            Returns an iterator of all top-level keys in hash table
+        key = k:
+            Returns an iterator of all keys in the bottom-hash-table for k.
+        """
+        if key is None:
+            return self.index.iter_keys()
+        return self._iter_second(key, False)
+
+    def keys(self, key:K1|None=None) -> list[K1]:
+        """
+        key = None: returns all top-level keys in the table.
+        key = x: returns all bottom-level keys for top-level key x.
+        """
+        if key is None:
+            return self.index.keys()
+        return list(self.index[key])
+
+    def iter_values(self, key:K1|None=None) -> Iterator[V]:
+        """
+        key = None:
+            Returns an iterator of all values in hash table
+        key = k:
+            Returns an iterator of all values in the bottom-hash-table for k.
+        """
+        if key is None:
+            return (entry[0] for entry in self.table.iter_values())
+        return self._iter_second(key, True)
+
+    def _iter_second(self, key: K1, values: bool) -> Iterator[K2|V]:
+        """
+        Returns an iterator of the 2nd keys of key (or their values, if values is set).
+        Raises KeyError straight away if key is missing.
+
+        :complexity: O(1) per step for keys, see linear probe per step for values.
+        :raises RuntimeError: when the table is modified during iteration.
+        """
+        second_keys = self.index[key]
+        modifications = self.table.modifications
+
+        def steps() -> Iterator[K2|V]:
+            i = 0
+            while True:
+                if self.table.modifications != modifications:
+                    raise RuntimeError("Hash table modified during iteration.")
+                if i == len(second_keys):
+                    return
+                yield self.table[key, second_keys[i]][0] if values else second_keys[i]
+                i += 1
+
+        return steps()
+
+    def values(self, key:K1|None=None) -> list[V]:
+        """
+        key = None: returns all values in the table.
+        key = x: returns all values for top-level key x.
+        """
+        if key is None:
+            return [entry[0] for entry in self.table.values()]
+        return [entry[0] for entry in self.table.get_many([(key, key2) for key2 in self.index[key]])]
+
+    def __getitem__(self, key: tuple[K1, K2]) -> V:
+        """
+        Get the value at a certain key
+
+        :complexity: See linear probe.
+        :raises KeyError: when the key doesn't exist.
+        """
+        return self.table[key][0]
+
+    def __setitem__(self, key: tuple[K1, K2], data: V) -> None:
+        """
+        Set an (key, value) pair in our hash table.
+
+        :complexity: See linear probe, on both tables for a new pair.
+        """
+        key1, key2 = key
+        try:
+            second_keys = self.index[key1]
+        except KeyError:
+            second_keys = None
+        # One probe for a new pair: it goes in at the end of the list of key1.
+        entry = (data, 0 if second_keys is None else len(second_keys))
+        stored = self.table.setdefault(key, entry)
+        if stored is not entry:
+            self.table[key] = (data, stored[1])
+            return
+        self.count += 1
+        if second_keys is None:
+            self.index[key1] = [key2]
+        else:
+            second_keys.append(key2)
+
+    def get_many(self, keys: Iterable[tuple[K1, K2]]) -> list[V]:
+        """
+        Get the values for many (key1, key2) pairs, in the same order.
+
+        :complexity: See linear probe, per pair.
+        :raises KeyError: when any key doesn't exist.
+        """
+        return [entry[0] for entry in self.table.get_many(keys)]
+
+    def __delitem__(self, key: tuple[K1, K2]) -> None:
+        """
+        Deletes a (key, value) pair in our hash table.
+
+        The last 2nd key of key1 takes the place of the deleted one in the
+        index list. A 1st key with no 2nd keys left is removed from the index.
+        :complexity: See delete on the flat table, plus linear probe on both tables.
+        :raises KeyError: when the key doesn't exist.
+        """
+        key1, _ = key
+        _, position = self.table[key]
+        del self.table[key]
+        self.count -= 1
+        second_keys = self.index[key1]
+        last = second_keys.pop()
+        if position < len(second_keys):
+            second_keys[position] = last
+            moved = (key1, last)
+            self.table[moved] = (self.table[moved][0], position)
+        elif not second_keys:
+            del self.index[key1]
+
+    def _rehash(self) -> None:
+        """
+        Grow both the flat table and the index to their next size.
+
+        :complexity: See rehash on both tables.
+        """
+        self.table._rehash()
+        self.index._rehash()
+
+    @property
+    def table_size(self) -> int:
+        """
+        Return the current size of the top-level (index) table,
+        or of the flat table while hash_pair is hashing.
         """
-        raise NotImplementedError()
+        if self._hashing_pairs:
+            return self.table.table_size
+        return self.index.table_size
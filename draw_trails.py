@@ -10,6 +10,9 @@ from mountain import Mountain
 from utils import av, bezier
 from constants import DrawMode
 from trail import Trail, TrailSeries, TrailSplit
+from algorithms.traversal import depth_first
+from data_structures.linked_stack import LinkedStack
+from typing import Callable, Sequence
 
 @dataclass
 class Box:
@@ -64,52 +67,108 @@ class TrailDraw:
     ### Click constants
     LINE_VERTICAL_BOX = MOUNTAIN_HEIGHT / 2
 
-    def __init__(self, trail: TrailBox) -> None:
+    def __init__(self, trail: TrailBox, persistent: bool = False) -> None:
+        """
+        In persistent mode, actions from box_and_action replace self.trail with
+        a new version made by Trail.edit rather than changing trails in place,
+        so earlier versions can be returned to with undo and redo.
+        """
         self.trail = trail
+        self.persistent = persistent
+        self.undo_stack = LinkedStack()
+        self.redo_stack = LinkedStack()
+
+    # VERSIONS
+
+    def apply_edit(self, path: Sequence[str], change: Callable[[Trail], Trail]) -> None:
+        """Make a new version of the trail with Trail.edit, keeping the current one for undo."""
+        new_trail = self.trail.edit(path, change)
+        self.undo_stack.push(self.trail)
+        self.redo_stack.clear()
+        self.trail = new_trail
+
+    def undo(self) -> bool:
+        """Go back to the previous version, returning whether there was one."""
+        if self.undo_stack.is_empty():
+            return False
+        self.redo_stack.push(self.trail)
+        self.trail = self.undo_stack.pop()
+        return True
+
+    def redo(self) -> bool:
+        """Go forward to the version last undone, returning whether there was one."""
+        if self.redo_stack.is_empty():
+            return False
+        self.undo_stack.push(self.trail)
+        self.trail = self.redo_stack.pop()
+        return True
 
     # VISUAL CALCULATIONS
 
-    def required_height(self, cur_trail: TrailBox|None=None) -> int:
+    def _width(self, cur_trail: TrailBox, widths: list[int]) -> int:
+        """Width of cur_trail, given the widths of its children."""
+        cur_trail = cur_trail.store
         if cur_trail is None:
-            cur_trail = self.trail.store
+            return 0
+        elif isinstance(cur_trail, TrailSeries):
+            return self.TOTAL_MOUNTAIN_WIDTH + widths[0]
         else:
-            cur_trail = cur_trail.store
+            return 2 * self.BRANCH_WIDTH + max(
+                widths[0],
+                widths[1],
+                self.MIN_BRANCH_CONTENT_WIDTH,
+            ) + widths[2]
+
+    def _height(self, cur_trail: TrailBox, heights: list[int]) -> int:
+        """Height of cur_trail, given the heights of its children."""
+        cur_trail = cur_trail.store
         if cur_trail is None:
             return self.EMPTY_HEIGHT
         elif isinstance(cur_trail, TrailSeries):
-            return max(self.MOUNTAIN_HEIGHT, self.required_height(cur_trail.following))
+            return max(self.MOUNTAIN_HEIGHT, heights[0])
         else:
-            return max(
-                self.required_height(cur_trail.path_top) + self.BRANCH_SEPARATION + self.required_height(cur_trail.path_bottom),
-                self.required_height(cur_trail.path_follow)
-            )
+            return max(heights[0] + self.BRANCH_SEPARATION + heights[1], heights[2])
 
-    def required_width(self, cur_trail: TrailBox|None=None) -> int:
-        if cur_trail is None:
-            cur_trail = self.trail.store
-        else:
-            cur_trail = cur_trail.store
+    def _size(self, cur_trail: TrailBox, below: list[tuple[int, int]]) -> tuple[int, int]:
+        """(width, height) of cur_trail, given those of its children."""
+        return (
+            self._width(cur_trail, [w for w, _ in below]),
+            self._height(cur_trail, [h for _, h in below]),
+        )
+
+    def required_size(self, cur_trail: TrailBox|None=None) -> tuple[int, int]:
+        """
+        (width, height) of cur_trail, cached on every trail inside it,
+        so each trail is only measured again once it has changed.
+        """
         if cur_trail is None:
-            return 0
-        elif isinstance(cur_trail, TrailSeries):
-            return self.TOTAL_MOUNTAIN_WIDTH + self.required_width(cur_trail.following)
-        else:
-            return 2 * self.BRANCH_WIDTH + max(
-                self.required_width(cur_trail.path_top),
-                self.required_width(cur_trail.path_bottom),
-                self.MIN_BRANCH_CONTENT_WIDTH,
-            ) + self.required_width(cur_trail.path_follow)
+            cur_trail = self.trail
+        # Sizes depend on the constants, which subclasses may change.
+        return cur_trail.measure(type(self), self._size)
+
+    def required_height(self, cur_trail: TrailBox|None=None) -> int:
+        return self.required_size(cur_trail)[1]
+
+    def required_width(self, cur_trail: TrailBox|None=None) -> int:
+        return self.required_size(cur_trail)[0]
 
     def draw_in_box(self, height, width, minx, miny, cur_trail: TrailBox|None=None) -> None:
         if cur_trail is None:
-            ref_trail = self.trail
-            cur_trail = self.trail.store
-        else:
-            ref_trail = cur_trail
-            cur_trail = cur_trail.store
+            cur_trail = self.trail
+        # Measures every trail inside, so _draw_one only reads cached sizes.
+        self.required_size(cur_trail)
+        depth_first((cur_trail, height, width, minx, miny), lambda frame: self._draw_one(*frame))
+
+    def _draw_one(self, ref_trail: TrailBox, height, width, minx, miny) -> tuple:
+        """
+        Draw a single trail in its box, and return the boxes
+        (as draw_in_box arguments) of the trails inside it.
+        """
+        cur_trail = ref_trail.store
         if cur_trail is None:
             self.draw_line(minx, miny + height/2, minx + width, miny + height/2)
             ref_trail.trail_box = Box(minx, miny + height/2-self.LINE_VERTICAL_BOX, width, 2*self.LINE_VERTICAL_BOX)
+            return ()
         elif isinstance(cur_trail, TrailSeries):
             ref_trail.trail_box = Box(minx, miny, width, height)
             p1 = self.TOTAL_MOUNTAIN_WIDTH
@@ -133,7 +192,7 @@ class TrailDraw:
             cur_trail.mountain_box = Box(start_mountain_x, mid - mountain_actual_height/2, end_mountain_x - start_mountain_x, mountain_actual_height)
             cur_trail.after_box = Box(end_mountain_x, mid - mountain_actual_height/2, end_mountain_trail_x - end_mountain_x, mountain_actual_height)
             # Draw rest
-            self.draw_in_box(height, p2/total*width, minx+p1_total_dist, miny, cur_trail.following)
+            return ((cur_trail.following, height, p2/total*width, minx+p1_total_dist, miny),)
         else:
             ref_trail.trail_box = Box(minx, miny, width, height)
             b1 = self.required_width(cur_trail.path_top)
@@ -159,11 +218,12 @@ class TrailDraw:
             self.draw_branch(minx + width - b3_dist, mid, minx + width - self.BRANCH_WIDTH - b3_dist, miny + bot_section + self.BRANCH_SEPARATION + top_section / 2, miny + bot_section / 2)
             cur_trail.branch_start_box = Box(minx, mid - self.BRANCH_SEPARATION/2 - top_section/2, self.BRANCH_WIDTH, bot_section/2 + top_section/2 + self.BRANCH_SEPARATION)
             cur_trail.branch_end_box = Box(minx+width-b3_dist-self.BRANCH_WIDTH, mid - self.BRANCH_SEPARATION/2 - top_section/2, self.BRANCH_WIDTH, bot_section/2 + top_section/2 + self.BRANCH_SEPARATION)
-            # Draw top & bottom
-            self.draw_in_box(top_section, branch_dist, minx+self.BRANCH_WIDTH, miny+bot_section+self.BRANCH_SEPARATION, cur_trail.path_top)
-            self.draw_in_box(bot_section, branch_dist, minx+self.BRANCH_WIDTH, miny, cur_trail.path_bottom)
-            # Draw following
-            self.draw_in_box(height, b3_dist, minx + width - b3_dist, miny, cur_trail.path_follow)
+            # Draw top & bottom, then following
+            return (
+                (cur_trail.path_top, top_section, branch_dist, minx+self.BRANCH_WIDTH, miny+bot_section+self.BRANCH_SEPARATION),
+                (cur_trail.path_bottom, bot_section, branch_dist, minx+self.BRANCH_WIDTH, miny),
+                (cur_trail.path_follow, height, b3_dist, minx + width - b3_dist, miny),
+            )
 
     def draw_line(self, sx, sy, ex, ey):
         import arcade
@@ -214,42 +274,69 @@ class TrailDraw:
 
     def box_and_action(self, mouse_pos: tuple[float, float], mode=DrawMode, cur_trail: Trail|None=None, parent_sets: tuple[Trail, str]|None=None) -> tuple[Box|None, function|None, Trail|None]:
         if cur_trail is None:
-            ref_trail = self.trail
-            cur_trail = self.trail.store
+            cur_trail = self.trail
             parent_sets = (self, "trail")
-        else:
-            ref_trail = cur_trail
-            cur_trail = cur_trail.store
-        if mouse_pos not in ref_trail.trail_box:
-            return None, None, None
+        elif self.persistent:
+            raise ValueError("Persistent edits are made from the root trail.")
+        # Attributes followed from self.trail, for persistent edits,
+        # and the trails passed, whose cached sizes in place edits make stale.
+        path = []
+        spine = []
+        def invalidate_spine():
+            for trail in spine:
+                trail.invalidate()
         def set_m(ref, cur_method):
+            if self.persistent:
+                at = tuple(path)
+                def func(*m):
+                    self.apply_edit(at, lambda _: Trail(cur_method(*m)))
+                return func
             def func(*m):
                 ref.store = cur_method(*m)
+                invalidate_spine()
             return func
         def set_parent(parent_set, cur_method):
+            if self.persistent:
+                at = tuple(path)
+                def func(*m):
+                    self.apply_edit(at, lambda _: cur_method(*m))
+                return func
             parent, attribute = parent_set
             def func(*m):
                 setattr(parent, attribute, cur_method(*m))
+                invalidate_spine()
             return func
-        if cur_trail is None:
-            if mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
-                return ref_trail.trail_box, set_parent(parent_sets, ref_trail.add_mountain_before if mode == DrawMode.ADD_MOUNTAIN else ref_trail.add_empty_branch_before), cur_trail
-        elif isinstance(cur_trail, TrailSeries):
-            if mouse_pos in cur_trail.before_box and mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
-                return cur_trail.before_box, set_m(ref_trail, cur_trail.add_mountain_before if mode == DrawMode.ADD_MOUNTAIN else cur_trail.add_empty_branch_before), cur_trail
-            if mouse_pos in cur_trail.mountain_box and mode in [DrawMode.REMOVE, DrawMode.EDIT]:
-                return cur_trail.mountain_box, (set_m(ref_trail, cur_trail.remove_mountain) if mode == DrawMode.REMOVE else lambda: cur_trail.mountain), cur_trail
-            if mouse_pos in cur_trail.after_box and mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
-                return cur_trail.after_box, set_m(ref_trail, cur_trail.add_mountain_after if mode == DrawMode.ADD_MOUNTAIN else cur_trail.add_empty_branch_after), cur_trail
-            return self.box_and_action(mouse_pos, mode, cur_trail.following, (cur_trail, 'following'))
-        else:
-            if mouse_pos in cur_trail.branch_start_box and mode == DrawMode.REMOVE:
-                return cur_trail.branch_start_box, set_m(ref_trail, cur_trail.remove_branch), cur_trail
-            if mouse_pos in cur_trail.branch_end_box and mode == DrawMode.REMOVE:
-                return cur_trail.branch_end_box, set_m(ref_trail, cur_trail.remove_branch), cur_trail
-            if mouse_pos in cur_trail.path_bottom.trail_box:
-                return self.box_and_action(mouse_pos, mode, cur_trail.path_bottom, (cur_trail, 'path_bottom'))
-            if mouse_pos in cur_trail.path_top.trail_box:
-                return self.box_and_action(mouse_pos, mode, cur_trail.path_top, (cur_trail, 'path_top'))
-            return self.box_and_action(mouse_pos, mode, cur_trail.path_follow, (cur_trail, 'path_follow'))
-        return None, None, None
+        # Walk down towards the mouse, rather than recursing once per trail.
+        while True:
+            ref_trail = cur_trail
+            cur_trail = cur_trail.store
+            spine.append(ref_trail)
+            if mouse_pos not in ref_trail.trail_box:
+                return None, None, None
+            if cur_trail is None:
+                if mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
+                    return ref_trail.trail_box, set_parent(parent_sets, ref_trail.add_mountain_before if mode == DrawMode.ADD_MOUNTAIN else ref_trail.add_empty_branch_before), cur_trail
+                return None, None, None
+            elif isinstance(cur_trail, TrailSeries):
+                if mouse_pos in cur_trail.before_box and mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
+                    return cur_trail.before_box, set_m(ref_trail, cur_trail.add_mountain_before if mode == DrawMode.ADD_MOUNTAIN else cur_trail.add_empty_branch_before), cur_trail
+                if mouse_pos in cur_trail.mountain_box and mode in [DrawMode.REMOVE, DrawMode.EDIT]:
+                    return cur_trail.mountain_box, (set_m(ref_trail, cur_trail.remove_mountain) if mode == DrawMode.REMOVE else lambda: cur_trail.mountain), cur_trail
+                if mouse_pos in cur_trail.after_box and mode in [DrawMode.ADD_MOUNTAIN, DrawMode.ADD_BRANCH]:
+                    return cur_trail.after_box, set_m(ref_trail, cur_trail.add_mountain_after if mode == DrawMode.ADD_MOUNTAIN else cur_trail.add_empty_branch_after), cur_trail
+                cur_trail, parent_sets = cur_trail.following, (cur_trail, 'following')
+                path.append('following')
+            else:
+                if mouse_pos in cur_trail.branch_start_box and mode == DrawMode.REMOVE:
+                    return cur_trail.branch_start_box, set_m(ref_trail, cur_trail.remove_branch), cur_trail
+                if mouse_pos in cur_trail.branch_end_box and mode == DrawMode.REMOVE:
+                    return cur_trail.branch_end_box, set_m(ref_trail, cur_trail.remove_branch), cur_trail
+                if mouse_pos in cur_trail.path_bottom.trail_box:
+                    cur_trail, parent_sets = cur_trail.path_bottom, (cur_trail, 'path_bottom')
+                    path.append('path_bottom')
+                elif mouse_pos in cur_trail.path_top.trail_box:
+                    cur_trail, parent_sets = cur_trail.path_top, (cur_trail, 'path_top')
+                    path.append('path_top')
+                else:
+                    cur_trail, parent_sets = cur_trail.path_follow, (cur_trail, 'path_follow')
+                    path.append('path_follow')
@@ -15,59 +15,248 @@ class InfiniteHashTable(Generic[K, V]):
                 Otherwise `hash` should be overwritten.
         - V:    Value Type.
 
+    Every slot holds nothing, a (key, value) pair, or the table for the
+    next level, hashing on the next character. Keys that collide are moved
+    down together until they land in different slots, and a table left
+    with a single pair gives it back to the table above.
+
+    With compressed set, levels where all keys of a table share a slot
+    get no table of their own: the table for the next level where they
+    differ is used directly, and keeps the slots of the levels it skips
+    as its label. Only levels where keys branch cost a table, and
+    get_location still gives a slot for every level, as if uncompressed.
+
+    count is the number of keys in a table and the tables below it.
+
     Unless stated otherwise, all methods have O(1) complexity.
     """
 
     TABLE_SIZE = 27
 
-    def __init__(self) -> None:
-        raise NotImplementedError()
+    def __init__(self, level: int = 0, compressed: bool = False) -> None:
+        self.array: ArrayR[tuple[K, V]|InfiniteHashTable[K, V]|None] = ArrayR(self.TABLE_SIZE)
+        self.level = level
+        self.compressed = compressed
+        # Slots of the levels skipped just above this table, when compressed.
+        self.label: list[int] = []
+        self.count = 0
 
     def hash(self, key: K) -> int:
         if self.level < len(key):
             return ord(key[self.level]) % (self.TABLE_SIZE-1)
         return self.TABLE_SIZE-1
 
+    def _hash_at(self, key: K, level: int) -> int:
+        """
+        Hash a key as a table at another level would, by hashing while level is that level.
+        This works for overwritten hashes too, as long as they use level.
+        """
+        current = self.level
+        self.level = level
+        try:
+            return self.hash(key)
+        finally:
+            self.level = current
+
+    def _branching_level(self, key1: K, key2: K, level: int) -> int:
+        """
+        The first level from level on where two different keys hash to different slots.
+
+        :complexity: O(L) where L is the number of levels checked.
+        :raises ValueError: when the keys hash to the same slot at every level.
+        """
+        while self._hash_at(key1, level) == self._hash_at(key2, level):
+            if level >= max(len(key1), len(key2)):
+                raise ValueError(f"Keys {key1!r} and {key2!r} hash to the same slot at every level.")
+            level += 1
+        return level
+
+    def _sub_table(self, level: int) -> InfiniteHashTable[K, V]:
+        return type(self)(level, self.compressed)
+
+    def _push_down(self, old: tuple[K, V], new: tuple[K, V]) -> InfiniteHashTable[K, V]:
+        """
+        Make the tables below this one that tell apart the keys of two pairs
+        that collided here, with both pairs in the last of them.
+
+        :return: The table for the next level.
+        :complexity: O(L) where L is the number of levels until the keys branch.
+        :raises ValueError: when the keys can never be told apart.
+        """
+        branch = self._branching_level(old[0], new[0], self.level + 1)
+        last = self._sub_table(branch)
+        last.array[last.hash(old[0])] = old
+        last.array[last.hash(new[0])] = new
+        last.count = 2
+        if self.compressed:
+            last.label = [self._hash_at(new[0], level) for level in range(self.level + 1, branch)]
+            return last
+        top = last
+        for level in range(branch - 1, self.level, -1):
+            table = self._sub_table(level)
+            table.array[table.hash(new[0])] = top
+            table.count = 2
+            top = table
+        return top
+
+    def _split_label(self, slot: int, key: K, value: V) -> bool:
+        """
+        If key leaves the label of the table in slot, put a new table where
+        it does, holding that table (with the rest of its label) and the pair.
+
+        :return: Whether the pair was added.
+        :complexity: O(label length)
+        """
+        sub_table = self.array[slot]
+        for i, expected in enumerate(sub_table.label):
+            level = self.level + 1 + i
+            position = self._hash_at(key, level)
+            if position != expected:
+                table = self._sub_table(level)
+                table.label = sub_table.label[:i]
+                sub_table.label = sub_table.label[i + 1:]
+                table.array[expected] = sub_table
+                table.array[position] = (key, value)
+                table.count = sub_table.count + 1
+                self.array[slot] = table
+                return True
+        return False
+
     def __getitem__(self, key: K) -> V:
         """
         Get the value at a certain key
 
+        :complexity: O(D*hash(K) + comp(K)) where D is the number of tables passed.
         :raises KeyError: when the key doesn't exist.
         """
-        raise NotImplementedError()
+        table = self
+        while True:
+            item = table.array[table.hash(key)]
+            if isinstance(item, InfiniteHashTable):
+                table = item
+            elif item is not None and item[0] == key:
+                return item[1]
+            else:
+                raise KeyError(key)
 
     def __setitem__(self, key: K, value: V) -> None:
         """
         Set an (key, value) pair in our hash table.
+
+        :complexity: O(D*hash(K) + comp(K)) where D is the number of tables
+            passed, plus O(L) for the levels until a colliding key branches.
+        :raises ValueError: when the key collides with one it can never be told apart from.
         """
-        raise NotImplementedError()
+        passed = []
+        table = self
+        while True:
+            slot = table.hash(key)
+            item = table.array[slot]
+            if isinstance(item, InfiniteHashTable):
+                passed.append(table)
+                if table.compressed and table._split_label(slot, key, value):
+                    break
+                table = item
+                continue
+            if item is None:
+                table.array[slot] = (key, value)
+            elif item[0] == key:
+                table.array[slot] = (key, value)
+                return
+            else:
+                table.array[slot] = table._push_down(item, (key, value))
+            passed.append(table)
+            break
+        for table in passed:
+            table.count += 1
 
     def __delitem__(self, key: K) -> None:
         """
         Deletes a (key, value) pair in our hash table.
 
+        A table left with one pair gives it back to the table above, and so
+        on up. When compressed, a table left holding only another table is
+        replaced by it, adding its level to the label.
+        :complexity: O(D*(hash(K) + TABLE_SIZE) + comp(K)) where D is the number of tables passed.
         :raises KeyError: when the key doesn't exist.
         """
-        raise NotImplementedError()
+        # (table, slot of the next table in it)
+        passed = []
+        table = self
+        while True:
+            slot = table.hash(key)
+            item = table.array[slot]
+            if isinstance(item, InfiniteHashTable):
+                passed.append((table, slot))
+                table = item
+            elif item is not None and item[0] == key:
+                break
+            else:
+                raise KeyError(key)
+        table.array[slot] = None
+        table.count -= 1
+        for parent, _ in passed:
+            parent.count -= 1
+
+        while passed:
+            parent, parent_slot = passed.pop()
+            occupied = [position for position in range(self.TABLE_SIZE) if table.array[position] is not None]
+            if table.count == 1:
+                parent.array[parent_slot] = table.array[occupied[0]]
+            elif table.compressed and len(occupied) == 1:
+                only = table.array[occupied[0]]
+                only.label = table.label + [occupied[0]] + only.label
+                parent.array[parent_slot] = only
+                break
+            else:
+                break
+            table = parent
 
-    def __len__(self):
-        raise NotImplementedError()
+    def __len__(self) -> int:
+        return self.count
 
     def __str__(self) -> str:
         """
         String representation.
 
         Not required but may be a good testing tool.
+        :complexity: O(T*TABLE_SIZE + N*(str(key) + str(value))) where T is
+            the number of tables and N the number of keys.
         """
-        raise NotImplementedError()
+        result = ""
+        stack = [self]
+        while stack:
+            table = stack.pop()
+            for item in table.array:
+                if isinstance(item, InfiniteHashTable):
+                    stack.append(item)
+                elif item is not None:
+                    result += "(" + str(item[0]) + "," + str(item[1]) + ")\n"
+        return result
 
     def get_location(self, key):
         """
         Get the sequence of positions required to access this key.
 
+        When compressed, the slots of skipped levels are included, so the
+        positions are the same as without compression.
+        :complexity: O(D*hash(K) + comp(K) + L) where D is the number of
+            tables passed and L the number of positions.
         :raises KeyError: when the key doesn't exist.
         """
-        raise NotImplementedError()
+        location = []
+        table = self
+        while True:
+            slot = table.hash(key)
+            location.append(slot)
+            item = table.array[slot]
+            if isinstance(item, InfiniteHashTable):
+                location.extend(item.label)
+                table = item
+            elif item is not None and item[0] == key:
+                return location
+            else:
+                raise KeyError(key)
 
     def __contains__(self, key: K) -> bool:
         """
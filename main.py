@@ -282,7 +282,7 @@ class MyWindow(arcade.Window):
             t = deserialize(json.loads(f.read()))
         try:
             # Try to add all existing mountains
-            for mountain in t.collect_all_mountains():
+            for mountain in t.iter_mountains():
                 self.mountain_manager.add_mountain(mountain)
         except NotImplementedError:
             pass
@@ -391,22 +391,25 @@ class MyWindow(arcade.Window):
             ]
         groups = self.mountain_manager.group_by_difficulty()
         to = MountainOrganiser()
-        positions = DoubleKeyTable()
+        positions = DoubleKeyTable(lazy_inner=True)
         positions.hash1 = lambda k: (k % positions.table_size)
         all_mountains = []
+        all_keys = []
         for i, group in enumerate(groups):
             to.add_mountains(group)
-            for mountain in group:
-                positions[mountain.difficulty_level, mountain.name] = []
+            group_keys = [(mountain.difficulty_level, mountain.name) for mountain in group]
+            positions.set_many([(key, []) for key in group_keys])
             all_mountains.extend(group)
-            for mountain in all_mountains:
-                positions[mountain.difficulty_level, mountain.name].append(to.cur_position(mountain))
+            all_keys.extend(group_keys)
+            for mountain, mountain_positions in zip(all_mountains, positions.get_many(all_keys)):
+                mountain_positions.append(to.cur_position(mountain))
+        all_positions = positions.get_many(all_keys)
         self.graph_data = [
             [
                 get_col(i, len(all_mountains)),
-                len(groups) - len(positions[mountain.difficulty_level, mountain.name]),
+                len(groups) - len(all_positions[i]),
                 mountain.name,
-                positions[mountain.difficulty_level, mountain.name]
+                all_positions[i]
             ]
             for i, mountain in enumerate(all_mountains)
         ]
@@ -449,6 +452,8 @@ class MyWindow(arcade.Window):
         self.cur_editing_mountain.name = self.input_mountain_name.text
         self.cur_editing_mountain.difficulty_level = int(self.input_difficulty_level.text)
         self.cur_editing_mountain.length = int(self.input_length.text)
+        # The mountain may be anywhere in the trail, so none of its cached values can be trusted.
+        self.mountain.trail.invalidate_all()
         try:
             self.mountain_manager.edit_mountain(old_mountain, self.cur_editing_mountain)
         except NotImplementedError:
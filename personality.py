@@ -1,30 +1,64 @@
 from abc import ABC, abstractmethod
+from typing import Iterable
 from mountain import Mountain
 from trail import Trail
 
 class WalkerPersonality(ABC):
 
+    # Whether select_branch depends only on the branches given, and not on the walker.
+    # Trail.follow_paths asks one walker of a deterministic class for all of them.
+    # Subclasses overriding select_branch must say again whether they are,
+    # or they are not trusted to be (see is_deterministic).
+    DETERMINISTIC = False
+
     def __init__(self) -> None:
         self.mountains = []
 
     def add_mountain(self, mountain: Mountain) -> None:
         self.mountains.append(mountain)
 
+    def add_mountains(self, mountains: Iterable[Mountain]) -> None:
+        """Add mountains in order, all at once unless add_mountain is overridden."""
+        if type(self).add_mountain is WalkerPersonality.add_mountain:
+            self.mountains.extend(mountains)
+        else:
+            for mountain in mountains:
+                self.add_mountain(mountain)
+
+    @classmethod
+    def is_deterministic(cls) -> bool:
+        """
+        Whether the class is DETERMINISTIC, only trusting the flag if it was
+        set by the class defining the select_branch in use, or a subclass of it.
+        """
+        flag_owner = next(kind for kind in cls.__mro__ if "DETERMINISTIC" in kind.__dict__)
+        branch_owner = next(kind for kind in cls.__mro__ if "select_branch" in kind.__dict__)
+        return cls.DETERMINISTIC and issubclass(flag_owner, branch_owner)
+
     @abstractmethod
     def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
         raise NotImplementedError()
 
 class TopWalker(WalkerPersonality):
+
+    DETERMINISTIC = True
+
     def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
         # Always select the top branch
         return True
 
 class BottomWalker(WalkerPersonality):
+
+    DETERMINISTIC = True
+
     def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
         # Always select the bottom branch
         return False
 
 class LazyWalker(WalkerPersonality):
+
+    DETERMINISTIC = True
+
     def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
         """
         Try looking into the first mountain on each branch,
@@ -2,6 +2,7 @@ import dataclasses, json
 
 from trail import Trail, TrailSplit, TrailSeries
 from mountain import Mountain
+from algorithms.traversal import fold
 
 # https://stackoverflow.com/questions/51286748/make-the-python-json-encoder-support-pythons-new-dataclasses
 class EnhancedJSONEncoder(json.JSONEncoder):
@@ -26,18 +27,23 @@ class EnhancedJSONEncoder(json.JSONEncoder):
 def serialize(trail):
     return json.dumps(trail, cls=EnhancedJSONEncoder)
 
-def deserialize(obj):
+def _stored_trails(obj):
+    store = obj["store"]
+    if store is None:
+        return ()
+    if "mountain" in store:
+        return (store["following"],)
+    return (store["path_top"], store["path_bottom"], store["path_follow"])
+
+def _build_trail(obj, inner):
     if obj["store"] is None:
         return Trail(None)
     if "mountain" in obj["store"]:
-        inside = TrailSeries(
-            Mountain(**obj["store"]["mountain"]),
-            deserialize(obj["store"]["following"])
-        )
+        inside = TrailSeries(Mountain(**obj["store"]["mountain"]), inner[0])
     else:
-        inside = TrailSplit(
-            deserialize(obj["store"]["path_top"]),
-            deserialize(obj["store"]["path_bottom"]),
-            deserialize(obj["store"]["path_follow"])
-        )
+        inside = TrailSplit(*inner)
     return Trail(inside)
+
+def deserialize(obj):
+    # Built bottom up with an explicit stack, so deep trails don't hit the recursion limit.
+    return fold(obj, _stored_trails, _build_trail)
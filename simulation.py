@@ -0,0 +1,115 @@
+"""
+Monte Carlo simulation of hikers taking random branches along a trail.
+
+Walkers are split into fixed size chunks, each with its own random
+generator seeded from the simulation seed and the chunk number, so the
+results only depend on the seed, never on how many processes ran them.
+Each worker process is given the trail once, when it starts, as a
+CompiledTrail: its flat arrays pickle at any depth, and are much smaller.
+"""
+from __future__ import annotations
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import random
+
+from compiled_trail import CompiledTrail
+from mountain import Mountain
+from personality import WalkerPersonality
+from trail import Trail
+
+# Walkers simulated by a worker per task.
+CHUNK_SIZE = 1000
+
+class RandomWalker(WalkerPersonality):
+    """Takes the top branch with some probability, using the random generator given."""
+
+    def __init__(self, rng: random.Random, top_probability: float = 0.5) -> None:
+        super().__init__()
+        self.rng = rng
+        self.top_probability = top_probability
+
+    def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+        return self.rng.random() < self.top_probability
+
+@dataclass
+class SimulationStats:
+    """
+    Totals over the walkers simulated.
+    Mountains are counted by name, since each process has its own copies of them.
+    """
+
+    walkers: int = 0
+    visits: Counter[str] = field(default_factory=Counter)
+    lengths: Counter[int] = field(default_factory=Counter)
+    difficulties: Counter[int] = field(default_factory=Counter)
+
+    def add_walk(self, mountains: list[Mountain]) -> None:
+        """Count one walker's mountains."""
+        self.walkers += 1
+        for mountain in mountains:
+            self.visits[mountain.name] += 1
+        self.lengths[sum(mountain.length for mountain in mountains)] += 1
+        self.difficulties[sum(mountain.difficulty_level for mountain in mountains)] += 1
+
+    def merge(self, other: SimulationStats) -> None:
+        """Add the totals of another simulation to these."""
+        self.walkers += other.walkers
+        self.visits.update(other.visits)
+        self.lengths.update(other.lengths)
+        self.difficulties.update(other.difficulties)
+
+def _simulate_chunk(trail: Trail|CompiledTrail, seed: int, chunk: int, walkers: int, top_probability: float) -> SimulationStats:
+    rng = random.Random(f"{seed}:{chunk}")
+    stats = SimulationStats()
+    for _ in range(walkers):
+        walker = RandomWalker(rng, top_probability)
+        trail.follow_path(walker)
+        stats.add_walk(walker.mountains)
+    return stats
+
+# The trail in a worker process, set once by _start_worker.
+_worker_trail: CompiledTrail|None = None
+
+def _start_worker(trail: CompiledTrail) -> None:
+    global _worker_trail
+    _worker_trail = trail
+
+def _simulate_worker_chunk(args: tuple[int, int, int, float]) -> SimulationStats:
+    return _simulate_chunk(_worker_trail, *args)
+
+def simulate(
+    trail: Trail|CompiledTrail,
+    walkers: int,
+    seed: int = 0,
+    processes: int|None = None,
+    top_probability: float = 0.5,
+) -> SimulationStats:
+    """
+    Send walkers along the trail, each taking the top branch with top_probability.
+
+    processes is the number of worker processes (the number of CPUs if None).
+    With 1, or when there is only one chunk of walkers, everything runs in
+    this process instead. Either way the same seed gives the same results.
+
+    :complexity: O(W*L) split over the processes, where W is the number of
+        walkers and L the number of trails along a path, plus O(N) per
+        process to send the trail.
+    :raises ValueError: when walkers is negative.
+    """
+    if walkers < 0:
+        raise ValueError("walkers must not be negative.")
+    chunks = [
+        (seed, chunk, min(CHUNK_SIZE, walkers - start), top_probability)
+        for chunk, start in enumerate(range(0, walkers, CHUNK_SIZE))
+    ]
+    stats = SimulationStats()
+    if processes == 1 or len(chunks) <= 1:
+        for args in chunks:
+            stats.merge(_simulate_chunk(trail, *args))
+        return stats
+    sent = trail if isinstance(trail, CompiledTrail) else CompiledTrail.from_trail(trail)
+    with ProcessPoolExecutor(max_workers=processes, initializer=_start_worker, initargs=(sent,)) as pool:
+        for result in pool.map(_simulate_worker_chunk, chunks):
+            stats.merge(result)
+    return stats
@@ -0,0 +1,84 @@
+import pickle
+import unittest
+
+from compiled_trail import CompiledTrail
+from mountain import Mountain
+from personality import WalkerPersonality, TopWalker, BottomWalker, LazyWalker
+from serialize import serialize
+from simulation import simulate
+from trail import Trail, TrailSeries, TrailSplit
+
+class TestCompiledTrail(unittest.TestCase):
+
+    def setUp(self):
+        self.top_top = Mountain("top-top", 5, 3)
+        self.top_bot = Mountain("top-bot", 3, 5)
+        self.top_mid = Mountain("top-mid", 4, 7)
+        self.bot_one = Mountain("bot-one", 2, 5)
+        self.bot_two = Mountain("bot-two", 0, 0)
+        self.final   = Mountain("final", 4, 4)
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSplit(
+                Trail(TrailSeries(self.top_top, Trail(None))),
+                Trail(TrailSeries(self.top_bot, Trail(None))),
+                Trail(TrailSeries(self.top_mid, Trail(None))),
+            )),
+            Trail(TrailSeries(self.bot_one, Trail(TrailSplit(
+                Trail(TrailSeries(self.bot_two, Trail(None))),
+                Trail(None),
+                Trail(None),
+            )))),
+            Trail(TrailSeries(self.final, Trail(None)))
+        ))
+        self.compiled = CompiledTrail.from_trail(self.trail)
+
+    def names(self, mountains):
+        return [mountain.name for mountain in mountains]
+
+    def test_round_trip(self):
+        self.assertEqual(len(self.compiled), 16)
+        self.assertEqual(serialize(self.compiled.to_trail()), serialize(self.trail))
+        self.assertEqual(serialize(CompiledTrail.from_trail(Trail(None)).to_trail()), serialize(Trail(None)))
+        copy = pickle.loads(pickle.dumps(self.compiled))
+        self.assertEqual(serialize(copy.to_trail()), serialize(self.trail))
+
+    def test_mountains(self):
+        expected = self.names(self.trail.collect_all_mountains())
+        self.assertEqual(self.names(self.compiled.collect_all_mountains()), expected)
+        self.assertEqual(self.names(self.compiled.iter_mountains()), expected)
+        self.assertEqual([self.compiled.names[i] for i in self.compiled.mountain_order()], expected)
+        # The same mountain twice is only stored once.
+        m = Mountain("m", 1, 2)
+        compiled = CompiledTrail.from_trail(Trail(TrailSeries(m, Trail(TrailSeries(m, Trail(None))))))
+        self.assertEqual(compiled.names, ["m"])
+        self.assertEqual(list(compiled.mountain_order()), [0, 0])
+
+    def test_count_length_k_paths(self):
+        for k in range(5):
+            self.assertEqual(self.compiled.count_length_k_paths(k), self.trail.count_length_k_paths(k))
+        self.assertRaises(ValueError, lambda: self.compiled.count_length_k_paths(-1))
+
+    def test_walkers(self):
+        for kind in (TopWalker, BottomWalker, LazyWalker):
+            on_trail, on_compiled = kind(), kind()
+            self.trail.follow_path(on_trail)
+            self.compiled.follow_path(on_compiled)
+            self.assertEqual(self.names(on_compiled.mountains), self.names(on_trail.mountains))
+        self.assertEqual(simulate(self.compiled, 300, seed=3, processes=1), simulate(self.trail, 300, seed=3, processes=1))
+
+    def test_choices_see_mountains_added(self):
+        class FreshWalker(WalkerPersonality):
+            # Takes the top branch only while it has not climbed anything yet.
+            def select_branch(self, top_branch, bottom_branch) -> bool:
+                return not self.mountains
+
+        trail = Trail(TrailSeries(Mountain("a", 1, 1), Trail(TrailSplit(
+            Trail(TrailSeries(Mountain("top", 1, 1), Trail(None))),
+            Trail(TrailSeries(Mountain("bot", 1, 1), Trail(None))),
+            Trail(None),
+        ))))
+        on_trail, on_compiled = FreshWalker(), FreshWalker()
+        trail.follow_path(on_trail)
+        CompiledTrail.from_trail(trail).follow_path(on_compiled)
+        self.assertEqual(self.names(on_trail.mountains), ["a", "bot"])
+        self.assertEqual(self.names(on_compiled.mountains), ["a", "bot"])
@@ -1,7 +1,8 @@
 import unittest
 from ed_utils.decorators import number
 
-from double_key_table import DoubleKeyTable
+from double_key_table import DoubleKeyTableADT, DoubleKeyTable, FlatDoubleKeyTable, SingleEntryTable
+from data_structures.hash_table import FullError
 
 class TestDoubleHash(unittest.TestCase):
 
@@ -123,3 +124,263 @@ class TestDoubleHash(unittest.TestCase):
         # with an iterator.
         self.assertRaises(BaseException, lambda: next(key_iterator))
         self.assertRaises(BaseException, lambda: next(value_iterator))
+
+    def test_robin_hood(self):
+        dt = DoubleKeyTable(robin_hood=True)
+        for i in range(200):
+            dt[str(i % 17), str(i)] = i
+        self.assertEqual(len(dt), 200)
+        self.assertEqual(set(dt.keys()), {str(i) for i in range(17)})
+        self.assertEqual(set(dt.keys("3")), {str(i) for i in range(3, 200, 17)})
+        for i in range(0, 200, 2):
+            del dt[str(i % 17), str(i)]
+        self.assertEqual(len(dt), 100)
+        self.assertEqual(sorted(dt.values()), list(range(1, 200, 2)))
+        self.assertRaises(KeyError, lambda: dt["0", "0"])
+        self.assertEqual(dt["0", "17"], 17)
+
+    def test_robin_hood_fixed_size(self):
+        dt = DoubleKeyTable(sizes=[12], internal_sizes=[5], robin_hood=True)
+        for i in range(5):
+            dt["May", str(i)] = i
+        self.assertRaises(FullError, lambda: dt.__setitem__(("May", "5"), 5))
+        self.assertEqual(sorted(dt.values("May")), list(range(5)))
+
+    def test_incremental(self):
+        for table_type in (DoubleKeyTable, FlatDoubleKeyTable):
+            dt = table_type(incremental=True)
+            dt.hash1 = lambda k: k % dt.table_size
+            for i in range(2000):
+                dt[i % 300, str(i)] = i
+                if i % 7 == 0:
+                    del dt[i % 300, str(i)]
+            self.assertEqual(dt[17, "617"], 617)
+            self.assertNotIn((0, "0"), dt)
+            self.assertEqual(len(dt), 2000 - 286)
+            self.assertEqual(sorted(dt.keys()), list(range(300)))
+            self.assertEqual(sorted(dt.values()), [i for i in range(2000) if i % 7])
+
+    def test_lazy_inner(self):
+        dt = DoubleKeyTable(lazy_inner=True)
+        dt["Tim", "Jen"] = 1
+        dt["Amy", "Ben"] = 2
+        self.assertIsInstance(dt.top_table["Tim"], SingleEntryTable)
+        dt["Tim", "Jen"] = 3
+        self.assertIsInstance(dt.top_table["Tim"], SingleEntryTable)
+        self.assertEqual(dt._linear_probe("Tim", "Jen", False)[1], 0)
+        self.assertRaises(KeyError, lambda: dt._linear_probe("Tim", "Bob", False))
+        # A second key moves to a real table.
+        dt["Tim", "Bob"] = 4
+        self.assertNotIsInstance(dt.top_table["Tim"], SingleEntryTable)
+        self.assertEqual(set(dt.keys("Tim")), {"Jen", "Bob"})
+        self.assertEqual(dt["Tim", "Jen"], 3)
+        self.assertEqual(dt.values("Amy"), [2])
+        self.assertEqual(len(dt), 3)
+
+        # Emptied real tables are reused, single entry ones are dropped.
+        real = dt.top_table["Tim"]
+        del dt["Tim", "Jen"]
+        del dt["Tim", "Bob"]
+        del dt["Amy", "Ben"]
+        self.assertEqual(dt.free_tables, [real])
+        dt["Kim", "Liz"] = 5
+        dt["Kim", "Jim"] = 6
+        self.assertIs(dt.top_table["Kim"], real)
+        self.assertEqual(dt.free_tables, [])
+        self.assertEqual(sorted(dt.values()), [5, 6])
+        self.assertRaises(KeyError, lambda: dt["Tim", "Jen"])
+
+    def test_lazy_inner_iters(self):
+        dt = DoubleKeyTable(lazy_inner=True)
+        dt["May", "Jim"] = 1
+        key_iterator = dt.iter_keys("May")
+        value_iterator = dt.iter_values("May")
+        self.assertEqual(next(key_iterator), "Jim")
+        self.assertEqual(next(value_iterator), 1)
+        del dt["May", "Jim"]
+        self.assertRaises(RuntimeError, lambda: next(key_iterator))
+        self.assertRaises(RuntimeError, lambda: next(value_iterator))
+
+    def test_lazy_inner_matches(self):
+        for robin_hood in (False, True):
+            eager = DoubleKeyTable(robin_hood=robin_hood)
+            lazy = DoubleKeyTable(robin_hood=robin_hood, lazy_inner=True)
+            for i in range(1000):
+                key = (str(i * 31 % 97), str(i * 7 % 13))
+                if i % 4 == 0 and key in eager:
+                    del eager[key]
+                    del lazy[key]
+                else:
+                    eager[key] = i
+                    lazy[key] = i
+            self.assertEqual(len(lazy), len(eager))
+            self.assertEqual(set(lazy.keys()), set(eager.keys()))
+            for key1 in eager.keys():
+                self.assertEqual(set(lazy.keys(key1)), set(eager.keys(key1)))
+                for key2 in eager.keys(key1):
+                    self.assertEqual(lazy[key1, key2], eager[key1, key2])
+
+    def test_set_get_many(self):
+        for lazy_inner in (False, True):
+            dt = DoubleKeyTable(lazy_inner=lazy_inner)
+            dt["Tim", "Jen"] = 0
+            dt["Amy", "Ben"] = 0
+            dt.set_many([
+                (("Tim", "Jen"), 1),
+                (("May", "Ben"), 2),
+                (("Amy", "Bob"), 3),
+                (("Tim", "Kat"), 4),
+                (("May", "Ben"), 5),
+                (("Liz", "Jim"), 6),
+            ])
+            self.assertEqual(len(dt), 6)
+            self.assertEqual(dt["May", "Ben"], 5)
+            keys = [("Amy", "Ben"), ("Tim", "Kat"), ("Liz", "Jim"), ("Tim", "Jen"), ("Amy", "Bob"), ("Tim", "Kat")]
+            self.assertEqual(dt.get_many(keys), [0, 4, 6, 1, 3, 4])
+            self.assertEqual(dt.get_many(keys), [dt[key] for key in keys])
+            self.assertEqual(dt.get_many([]), [])
+            self.assertRaises(KeyError, lambda: dt.get_many([("Tim", "Jen"), ("Tim", "Bob")]))
+            self.assertRaises(KeyError, lambda: dt.get_many([("Bob", "Jen")]))
+
+    def test_set_many_resize(self):
+        for table_type in (DoubleKeyTable, FlatDoubleKeyTable):
+            dt = table_type()
+            dt.hash1 = lambda k: k % dt.table_size
+            pairs = [((i % 11, str(i)), i) for i in range(3000)]
+            dt.set_many(pairs)
+            self.assertEqual(len(dt), 3000)
+            self.assertEqual(sorted(dt.keys()), list(range(11)))
+            self.assertEqual(dt.get_many([key for key, _ in pairs]), list(range(3000)))
+            for key, value in pairs[::97]:
+                self.assertEqual(dt[key], value)
+
+
+class TestFlatDoubleKeyTable(unittest.TestCase):
+
+    def test_keys_values(self):
+        dt = FlatDoubleKeyTable()
+        dt["Tim", "Jen"] = 1
+        dt["Amy", "Ben"] = 2
+        dt["May", "Ben"] = 3
+        dt["Ivy", "Jen"] = 4
+        dt["May", "Tom"] = 5
+        dt["Tim", "Bob"] = 6
+        dt["May", "Jim"] = 7
+        dt["Het", "Liz"] = 8
+        dt["May", "Tom"] = 9
+
+        self.assertEqual(len(dt), 8)
+        self.assertEqual(set(dt.keys()), {"Tim", "Amy", "May", "Ivy", "Het"})
+        self.assertEqual(dt.keys("May"), ["Ben", "Tom", "Jim"])
+        self.assertEqual(list(dt.iter_keys("Tim")), ["Jen", "Bob"])
+        self.assertEqual(set(dt.values()), {1, 2, 3, 4, 6, 7, 8, 9})
+        self.assertEqual(dt.values("May"), [3, 9, 7])
+        self.assertEqual(list(dt.iter_values("Tim")), [1, 6])
+        self.assertIn(("May", "Jim"), dt)
+        self.assertNotIn(("Amy", "Jim"), dt)
+        self.assertRaises(KeyError, lambda: dt.keys("Bob"))
+        self.assertRaises(KeyError, lambda: dt.iter_values("Bob"))
+
+    def test_delete(self):
+        dt = FlatDoubleKeyTable()
+        dt["Tim", "Jen"] = 1
+        dt["Tim", "Bob"] = 2
+        dt["Amy", "Ben"] = 3
+        del dt["Tim", "Jen"]
+        self.assertEqual(dt.keys("Tim"), ["Bob"])
+        del dt["Tim", "Bob"]
+        self.assertEqual(dt.keys(), ["Amy"])
+        self.assertEqual(len(dt), 1)
+        self.assertRaises(KeyError, lambda: dt["Tim", "Bob"])
+        with self.assertRaises(KeyError):
+            del dt["Amy", "Jen"]
+        self.assertEqual(len(dt), 1)
+
+    def test_delete_moves_last(self):
+        dt = FlatDoubleKeyTable()
+        for name in ["Jen", "Bob", "Kat", "Liz"]:
+            dt["Tim", name] = name.lower()
+        del dt["Tim", "Bob"]
+        # Liz fills the gap, and remembers where it now is.
+        self.assertEqual(dt.keys("Tim"), ["Jen", "Liz", "Kat"])
+        del dt["Tim", "Liz"]
+        self.assertEqual(dt.keys("Tim"), ["Jen", "Kat"])
+        del dt["Tim", "Kat"]
+        self.assertEqual(dt.keys("Tim"), ["Jen"])
+        self.assertEqual(dt.values("Tim"), ["jen"])
+        dt["Tim", "Jen"] = "JEN"
+        self.assertEqual(dt.keys("Tim"), ["Jen"])
+        self.assertEqual(dt["Tim", "Jen"], "JEN")
+
+    def test_shared_base(self):
+        dt = FlatDoubleKeyTable()
+        self.assertIsInstance(dt, DoubleKeyTableADT)
+        self.assertNotIsInstance(dt, DoubleKeyTable)
+        self.assertIsInstance(DoubleKeyTable(), DoubleKeyTableADT)
+        dt["Tim", "Jen"] = 1
+        dt.set_many([(("Tim", "Bob"), 2), (("Amy", "Ben"), 3)])
+        self.assertEqual(dt.get_many([("Amy", "Ben"), ("Tim", "Jen")]), [3, 1])
+        self.assertIn(("Tim", "Bob"), dt)
+        self.assertEqual(str(dt).count("\n"), 3)
+
+    def test_matches_nested(self):
+        for robin_hood in (False, True):
+            nested = DoubleKeyTable(robin_hood=robin_hood)
+            flat = FlatDoubleKeyTable(robin_hood=robin_hood)
+            for i in range(300):
+                nested[str(i % 23), str(i)] = i
+                flat[str(i % 23), str(i)] = i
+            for i in range(0, 300, 3):
+                del nested[str(i % 23), str(i)]
+                del flat[str(i % 23), str(i)]
+            self.assertEqual(len(flat), len(nested))
+            self.assertEqual(set(flat.keys()), set(nested.keys()))
+            for key1 in nested.keys():
+                self.assertEqual(set(flat.keys(key1)), set(nested.keys(key1)))
+                self.assertEqual(sorted(flat.values(key1)), sorted(nested.values(key1)))
+            self.assertEqual(sorted(flat.values()), sorted(nested.values()))
+
+    def test_int_first_keys(self):
+        dt = FlatDoubleKeyTable()
+        dt.hash1 = lambda k: k % dt.table_size
+        for i in range(100):
+            dt[i % 7, str(i)] = [i]
+        dt[3, "3"].append(-3)
+        self.assertEqual(dt[3, "3"], [3, -3])
+        self.assertEqual(sorted(dt.keys()), list(range(7)))
+        self.assertEqual(dt.keys(6), [str(i) for i in range(6, 100, 7)])
+
+    def test_iters_fail_fast(self):
+        dt = FlatDoubleKeyTable()
+        dt["May", "Jim"] = 1
+        dt["May", "Tim"] = 2
+        self.assertRaises(KeyError, lambda: dt.iter_keys("Kim"))
+        key_iterator = dt.iter_keys("May")
+        value_iterator = dt.iter_values("May")
+        self.assertEqual(next(key_iterator), "Jim")
+        self.assertEqual(next(value_iterator), 1)
+        # Updating a value is not a modification.
+        dt["May", "Jim"] = 3
+        self.assertEqual(next(value_iterator), 2)
+        del dt["May", "Jim"]
+        self.assertRaises(RuntimeError, lambda: next(key_iterator))
+        self.assertRaises(RuntimeError, lambda: next(value_iterator))
+        key_iterator = dt.iter_keys("May")
+        dt["May", "Ben"] = 4
+        self.assertRaises(RuntimeError, lambda: next(key_iterator))
+
+    def test_hash1_override(self):
+        class LengthTable(FlatDoubleKeyTable):
+            def hash1(self, key):
+                return len(key) % self.table_size
+
+        dt = LengthTable()
+        hashed = []
+        dt.hash2 = lambda key, sub_table: hashed.append(key) or 0
+        dt["Tim", "Jen"] = 1
+        dt["Amy", "Ben"] = 2
+        # Same length, same hash2: the pairs share a home in the flat table.
+        self.assertEqual(dt.hash_pair(("Tim", "Jen")), dt.hash_pair(("Amy", "Ben")))
+        self.assertEqual(dt.hash_pair(("Tim", "Jen")), 3 * dt.HASH_BASE % dt.table.table_size)
+        self.assertEqual(dt["Amy", "Ben"], 2)
+        self.assertIn("Jen", hashed)
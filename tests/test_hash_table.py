@@ -0,0 +1,306 @@
+import unittest
+
+from data_structures.hash_table import LinearProbeTable, RobinHoodTable, FullError
+
+class TestLinearProbeTable(unittest.TestCase):
+
+    def test_insert_lookup_rehash(self):
+        lt = LinearProbeTable()
+        for i in range(1000):
+            lt[str(i)] = i
+        self.assertEqual(len(lt), 1000)
+        self.assertGreater(lt.table_size, 2000)
+        for i in range(1000):
+            self.assertEqual(lt[str(i)], i)
+        lt["5"] = "five"
+        self.assertEqual(lt["5"], "five")
+        self.assertEqual(len(lt), 1000)
+        self.assertRaises(KeyError, lambda: lt["1000"])
+
+    def test_parallel_storage(self):
+        lt = LinearProbeTable(sizes=[13])
+        lt["Tim"] = 1
+        position = lt._linear_probe("Tim", False)
+        self.assertEqual(lt.key_array[position], "Tim")
+        self.assertEqual(lt.value_array[position], 1)
+        self.assertEqual(lt.hash_array[position], lt.hash("Tim"))
+
+    def test_delete_uses_stored_hashes(self):
+        lt = LinearProbeTable(sizes=[13])
+        calls = []
+        def home_zero(key):
+            calls.append(key)
+            return 0
+        lt.hash = home_zero
+        for key in "abcde":
+            lt[key] = key.upper()
+        calls.clear()
+        del lt["a"]
+        # Only the deleted key gets hashed, the cluster reuses stored hashes.
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(lt._linear_probe("b", False), 0)
+        self.assertEqual(lt._linear_probe("e", False), 3)
+        self.assertEqual(set(lt.values()), set("BCDE"))
+        self.assertEqual(len(lt), 4)
+
+    def test_delete_wraps_around(self):
+        lt = LinearProbeTable(sizes=[13])
+        lt.hash = lambda key: {"a": 11, "b": 11, "c": 12, "d": 0}[key]
+        for key in "abcd":
+            lt[key] = key
+        # Cluster is 11, 12, 0, 1 wrapping past the end of the table.
+        del lt["a"]
+        self.assertEqual(lt._linear_probe("b", False), 11)
+        self.assertEqual(lt._linear_probe("c", False), 12)
+        self.assertEqual(lt._linear_probe("d", False), 0)
+        self.assertIsNone(lt.key_array[1])
+
+    def test_delete_churn(self):
+        lt = LinearProbeTable()
+        expected = {}
+        for i in range(2000):
+            key = str(i * 7919 % 1009)
+            if key in expected and i % 3:
+                del lt[key]
+                del expected[key]
+            else:
+                lt[key] = i
+                expected[key] = i
+        self.assertEqual(len(lt), len(expected))
+        for key, value in expected.items():
+            self.assertEqual(lt[key], value)
+        self.assertEqual(sorted(lt.keys()), sorted(expected))
+
+    def test_load_factors(self):
+        lt = LinearProbeTable(sizes=[5, 13, 29, 53], max_load_factor=0.75, min_load_factor=0.2)
+        for i in range(10):
+            lt[str(i)] = i
+        # 10 > 0.75 * 13, but not 0.75 * 29.
+        self.assertEqual(lt.table_size, 29)
+        for i in range(5):
+            del lt[str(i)]
+        # 5 < 0.2 * 29
+        self.assertEqual(lt.table_size, 13)
+        self.assertEqual(sorted(lt.values()), [5, 6, 7, 8, 9])
+        for i in range(5, 8):
+            del lt[str(i)]
+        self.assertEqual(lt.table_size, 5)
+        self.assertEqual(lt["9"], 9)
+        # The default never shrinks.
+        lt = LinearProbeTable()
+        for i in range(100):
+            lt[str(i)] = i
+        for i in range(100):
+            del lt[str(i)]
+        self.assertEqual(lt.table_size, 389)
+
+    def test_load_factor_hysteresis(self):
+        self.assertRaises(ValueError, lambda: LinearProbeTable(max_load_factor=1.5))
+        self.assertRaises(ValueError, lambda: LinearProbeTable(max_load_factor=1.0))
+        self.assertRaises(ValueError, lambda: RobinHoodTable(max_load_factor=1.0))
+        self.assertRaises(ValueError, lambda: LinearProbeTable(max_load_factor=0))
+        # Just under 1 still grows before the table fills up.
+        lt = LinearProbeTable(sizes=[5, 13], max_load_factor=0.99)
+        for i in range(6):
+            lt[str(i)] = i
+        self.assertEqual(lt.table_size, 13)
+        self.assertRaises(ValueError, lambda: LinearProbeTable(min_load_factor=0.3))
+        LinearProbeTable(min_load_factor=0.15)
+
+    def test_setdefault(self):
+        for table_type in (LinearProbeTable, RobinHoodTable):
+            lt = table_type()
+            first = []
+            self.assertIs(lt.setdefault("a", first), first)
+            self.assertIs(lt.setdefault("a", []), first)
+            self.assertEqual(len(lt), 1)
+            for i in range(100):
+                lt.setdefault(str(i), i)
+            self.assertEqual(len(lt), 101)
+            self.assertEqual(lt["7"], 7)
+
+    def test_from_items(self):
+        resizes = []
+        class CountingTable(LinearProbeTable):
+            def _resize(self, size_index):
+                resizes.append(size_index)
+                super()._resize(size_index)
+        lt = CountingTable.from_items((str(i), i) for i in range(1000))
+        # Straight to the size 1000 single inserts would have reached.
+        self.assertEqual(resizes, [9])
+        self.assertEqual(lt.table_size, 3079)
+        self.assertEqual(len(lt), 1000)
+        lt.update([("5", "five"), ("1000", 1000)])
+        self.assertEqual(resizes, [9])
+        self.assertEqual(lt.get_many(["5", "1000", "0"]), ["five", 1000, 0])
+        self.assertRaises(KeyError, lambda: lt.get_many(["1", "-1"]))
+
+    def test_delete_many(self):
+        lt = LinearProbeTable.from_items([(str(i), i) for i in range(100)], min_load_factor=0.1)
+        self.assertEqual(lt.table_size, 389)
+        lt.delete_many(str(i) for i in range(95))
+        # 5 is under 0.1 of every size down to 29.
+        self.assertEqual(lt.table_size, 29)
+        self.assertEqual(sorted(lt.values()), [95, 96, 97, 98, 99])
+        self.assertRaises(KeyError, lambda: lt.delete_many(["95", "0"]))
+        self.assertEqual(len(lt), 4)
+
+    def test_iterators(self):
+        lt = LinearProbeTable.from_items((str(i), i) for i in range(50))
+        keys = lt.iter_keys()
+        self.assertIn(next(keys), lt)
+        # Only as much of the table as needed is read.
+        first_three = [value for _, value in zip(range(3), lt.iter_values())]
+        self.assertEqual(len(first_three), 3)
+        self.assertEqual(dict(lt.iter_items()), {str(i): i for i in range(50)})
+        self.assertEqual(sorted(lt, key=int), [str(i) for i in range(50)])
+        # Updating a value is not a modification.
+        lt["0"] = "zero"
+        next(keys)
+        lt["new"] = 50
+        self.assertRaises(RuntimeError, lambda: next(keys))
+        values = lt.iter_values()
+        next(values)
+        del lt["new"]
+        self.assertRaises(RuntimeError, lambda: next(values))
+
+    def test_views(self):
+        lt = LinearProbeTable()
+        keys, values, items = lt.keys_view(), lt.values_view(), lt.items_view()
+        self.assertEqual(len(keys), 0)
+        lt["a"] = 1
+        lt["b"] = 2
+        self.assertEqual(len(values), 2)
+        self.assertEqual(set(keys), {"a", "b"})
+        self.assertEqual(sorted(values), [1, 2])
+        self.assertEqual(set(items), {("a", 1), ("b", 2)})
+        self.assertIn("a", keys)
+        self.assertIn(2, values)
+        self.assertIn(("b", 2), items)
+        self.assertNotIn(("b", 1), items)
+        self.assertNotIn(("c", 1), items)
+
+
+class TestRobinHoodTable(unittest.TestCase):
+
+    def assert_robin_hood(self, table):
+        """Probe distance never grows by more than one slot at a time."""
+        size = table.table_size
+        for p in range(size):
+            if table.key_array[p] is not None:
+                distance = (p - table.hash_array[p]) % size
+                prev = (p - 1) % size
+                if table.key_array[prev] is None:
+                    self.assertEqual(distance, 0)
+                else:
+                    self.assertLessEqual(distance, (prev - table.hash_array[prev]) % size + 1)
+
+    def test_full(self):
+        rt = RobinHoodTable(sizes=[5])
+        for i in range(5):
+            rt[str(i)] = i
+        # Fixed size, so a sixth key cannot displace anything: there is nowhere to carry it.
+        self.assertRaises(FullError, lambda: rt.__setitem__("5", 5))
+        self.assertEqual(len(rt), 5)
+        self.assertEqual(sorted(rt.values()), list(range(5)))
+        rt["0"] = "zero"
+        self.assertEqual(rt["0"], "zero")
+
+    def test_displacement(self):
+        rt = RobinHoodTable(sizes=[13])
+        homes = {"a": 0, "b": 0, "c": 1, "d": 0}
+        rt.hash = lambda key: homes[key]
+        for key in "abcd":
+            rt[key] = key.upper()
+        # d displaces c, which is closer to its home.
+        self.assertEqual([rt.key_array[p] for p in range(4)], ["a", "b", "d", "c"])
+        self.assert_robin_hood(rt)
+        # A missing key with home 1 stops at slot 3, where c is only 2 from home.
+        homes["e"] = 1
+        self.assertRaises(KeyError, lambda: rt["e"])
+        del rt["a"]
+        self.assertEqual([rt.key_array[p] for p in range(4)], ["b", "d", "c", None])
+        self.assertEqual(rt["c"], "C")
+
+    def test_churn(self):
+        rt = RobinHoodTable()
+        expected = {}
+        for i in range(3000):
+            key = str(i * 7919 % 1511)
+            if key in expected and i % 4 == 0:
+                del rt[key]
+                del expected[key]
+            else:
+                rt[key] = i
+                expected[key] = i
+        self.assert_robin_hood(rt)
+        self.assertEqual(len(rt), len(expected))
+        for key, value in expected.items():
+            self.assertEqual(rt[key], value)
+        for i in range(1511, 1600):
+            self.assertNotIn(str(i), rt)
+
+
+class TestIncrementalResize(unittest.TestCase):
+
+    def test_migration(self):
+        lt = LinearProbeTable(incremental=True)
+        for i in range(7):
+            lt[str(i)] = i
+        # Grown from 13 to 29 slots, with everything but one still in the old arrays.
+        self.assertEqual(lt.table_size, 29)
+        self.assertTrue(lt.is_migrating())
+        self.assertEqual([lt[str(i)] for i in range(7)], list(range(7)))
+        self.assertEqual(lt.get_many(["3", "0"]), [3, 0])
+        self.assertRaises(KeyError, lambda: lt["7"])
+        lt["5"] = "five"
+        del lt["6"]
+        self.assertRaises(KeyError, lambda: lt["6"])
+        self.assertEqual(lt["5"], "five")
+        self.assertEqual(len(lt), 6)
+        while lt.is_migrating():
+            lt["x"] = None
+            del lt["x"]
+        self.assertEqual(dict(lt.iter_items()), {"0": 0, "1": 1, "2": 2, "3": 3, "4": 4, "5": "five"})
+
+    def test_iteration_finishes_migration(self):
+        lt = LinearProbeTable(incremental=True)
+        for i in range(100):
+            lt[str(i)] = i
+        self.assertTrue(lt.is_migrating())
+        self.assertEqual(sorted(lt.values()), list(range(100)))
+        self.assertFalse(lt.is_migrating())
+
+    def test_deletes_finish_migration(self):
+        lt = LinearProbeTable(incremental=True)
+        for i in range(100):
+            lt[str(i)] = i
+        self.assertTrue(lt.is_migrating())
+        keys = [str(i) for i in range(0, 100, 2)]
+        lt.delete_many(keys[:5])
+        self.assertTrue(lt.is_migrating())
+        # Each deletion migrates MIGRATE_STEP slots, so a few deletes are enough.
+        lt.delete_many(keys[5:])
+        self.assertFalse(lt.is_migrating())
+        self.assertEqual(dict(lt.iter_items()), {str(i): i for i in range(1, 100, 2)})
+
+    def test_churn(self):
+        for table_type in (LinearProbeTable, RobinHoodTable):
+            lt = table_type(min_load_factor=0.1, incremental=True)
+            # Hashes depend on the table size, so old slots must be hashed for the old size.
+            lt.hash = lambda key: key * 7 % lt.table_size
+            expected = {}
+            for i in range(5000):
+                key = i * 7919 % 1511
+                if key in expected and (i % 3 == 0 or i > 4000):
+                    lt.delete_many([key]) if i % 2 else lt.__delitem__(key)
+                    expected.pop(key)
+                    self.assertNotIn(key, lt)
+                elif key not in expected or i % 5:
+                    lt[key] = i
+                    expected[key] = i
+                self.assertEqual(len(lt), len(expected))
+                if i % 97 == 0:
+                    for key, value in expected.items():
+                        self.assertEqual(lt[key], value)
+            self.assertEqual(dict(lt.iter_items()), expected)
@@ -0,0 +1,48 @@
+import unittest
+
+from data_structures import hashing
+from data_structures.hashing import polynomial_hash, polynomial_hash_many
+from data_structures.hash_table import LinearProbeTable
+
+def reference_hash(key, table_size, base=31):
+    value = 0
+    a = 31415
+    for char in key:
+        value = (ord(char) + a * value) % table_size
+        a = a * base % (table_size - 1)
+    return value
+
+class TestHashing(unittest.TestCase):
+
+    KEYS = ["", "a", "Tim", "linked", "linger", "mountain-" * 12, "été", "\U0001f3d4peak", "ab\x00"] + [str(i) for i in range(3000)]
+
+    def test_matches_reference(self):
+        for size in [5, 13, 1543, 1572869]:
+            expected = [reference_hash(key, size) for key in self.KEYS]
+            self.assertEqual([polynomial_hash(key, size) for key in self.KEYS], expected)
+            self.assertEqual(polynomial_hash_many(self.KEYS, size), expected)
+            # Memoised values are the same too.
+            self.assertEqual(polynomial_hash_many(self.KEYS, size), expected)
+
+    def test_memo_bounded(self):
+        old_size = hashing.MEMO_SIZE
+        hashing.MEMO_SIZE = 100
+        hashing._memo.clear()
+        try:
+            polynomial_hash("kept", 97)
+            for i in range(300):
+                polynomial_hash(str(i), 50 + i % 3)
+                # Used again and again, so never the least recently used.
+                polynomial_hash("kept", 97)
+            self.assertLessEqual(len(hashing._memo), 100)
+            self.assertIn(("kept", 97, 31), hashing._memo)
+            self.assertNotIn(("0", 50, 31), hashing._memo)
+            self.assertIn(("299", 52, 31), hashing._memo)
+        finally:
+            hashing.MEMO_SIZE = old_size
+
+    def test_table_layout_unchanged(self):
+        lt = LinearProbeTable.from_items((key, i) for i, key in enumerate(self.KEYS[1:]))
+        for key in self.KEYS[1:]:
+            self.assertEqual(lt.hash(key), reference_hash(key, lt.table_size))
+            self.assertEqual(lt.hash_array[lt._linear_probe(key, False)], lt.hash(key))
@@ -67,3 +67,81 @@ class TestInfiniteHash(unittest.TestCase):
         ih["lin"] = 10
         self.assertEqual(ih.get_location("lin"), [4])
         self.assertEqual(len(ih), 1)
+
+
+class TestCompressedInfiniteHash(unittest.TestCase):
+
+    KEYS = ["lin", "leg", "mine", "linked", "limp", "mining", "jake", "linger"]
+
+    def count_tables(self, ih):
+        tables, stack = 0, [ih]
+        while stack:
+            table = stack.pop()
+            tables += 1
+            stack.extend(item for item in table.array if isinstance(item, InfiniteHashTable))
+        return tables
+
+    def test_same_locations(self):
+        ih = InfiniteHashTable()
+        ch = InfiniteHashTable(compressed=True)
+        for i, key in enumerate(self.KEYS):
+            ih[key] = i
+            ch[key] = i
+            for other in self.KEYS[:i + 1]:
+                self.assertEqual(ch.get_location(other), ih.get_location(other))
+        self.assertEqual(ch.get_location("linked"), [4, 1, 6, 3])
+        # "mine" and "mining" share "min", so one table tells them apart.
+        self.assertEqual(ch.array[5].label, [1, 6])
+        self.assertEqual(self.count_tables(ch), 5)
+        self.assertEqual(self.count_tables(ih), 7)
+        for key in ["limp", "mine", "mining", "jake", "leg", "linger", "linked"]:
+            del ih[key]
+            del ch[key]
+            self.assertEqual(len(ch), len(ih))
+            self.assertEqual(ch.get_location("lin"), ih.get_location("lin"))
+        self.assertEqual(ch.get_location("lin"), [4])
+        self.assertEqual(ch["lin"], 0)
+        self.assertEqual(self.count_tables(ch), 1)
+
+    def test_long_shared_prefix(self):
+        ch = InfiniteHashTable(compressed=True)
+        prefix = "mountain-" * 20
+        keys = [prefix + suffix for suffix in ["a", "b", "ab", "abc", "ba", ""]]
+        for i, key in enumerate(keys):
+            ch[key] = i
+        self.assertEqual([ch[key] for key in keys], list(range(len(keys))))
+        self.assertEqual(len(ch.get_location(keys[3])), len(prefix) + 3)
+        # The root, one table where the suffixes start, and one for each shared suffix start.
+        self.assertEqual(self.count_tables(ch), 5)
+        self.assertRaises(KeyError, lambda: ch[prefix + "c"])
+        self.assertRaises(KeyError, lambda: ch.get_location(prefix[:-1]))
+
+    def test_churn(self):
+        ih = InfiniteHashTable()
+        ch = InfiniteHashTable(compressed=True)
+        expected = {}
+        words = ["line", "lines", "liner", "lined", "link", "links", "linking", "lint", "mint", "minted", "min", "m", "", "l"]
+        for i in range(600):
+            key = words[i * 7 % len(words)] + words[i * 3 % len(words)]
+            if key in expected and i % 3 == 0:
+                del ih[key]
+                del ch[key]
+                del expected[key]
+                self.assertNotIn(key, ch)
+            else:
+                ih[key] = i
+                ch[key] = i
+                expected[key] = i
+            self.assertEqual(len(ch), len(expected))
+            for other in expected:
+                self.assertEqual(ch.get_location(other), ih.get_location(other))
+                self.assertEqual(ch[other], expected[other])
+        self.assertEqual(sorted(str(ch).splitlines()), sorted(str(ih).splitlines()))
+
+    def test_inseparable_keys(self):
+        # "0" and "d" hash to the same slot at every level.
+        for compressed in (False, True):
+            ih = InfiniteHashTable(compressed=compressed)
+            ih["0"] = 1
+            self.assertRaises(ValueError, lambda: ih.__setitem__("d", 2))
+            self.assertEqual(len(ih), 1)
@@ -0,0 +1,98 @@
+import gc
+import unittest
+import weakref
+
+from data_structures.referential_array import ArrayR
+from data_structures.typed_array import IntArray, FloatArray
+
+class TestArrayR(unittest.TestCase):
+
+    def test_starts_at_none(self):
+        for length in [1, 2, 3, 7, 8, 1000, 1543]:
+            arr = ArrayR(length)
+            self.assertEqual(len(arr), length)
+            self.assertTrue(all(arr[i] is None for i in range(length)))
+        self.assertRaises(ValueError, lambda: ArrayR(0))
+
+    def test_releases_removed_items(self):
+        class Item:
+            pass
+        arr = ArrayR(20)
+        item = Item()
+        ref = weakref.ref(item)
+        arr[11] = item
+        arr[-1] = item
+        del item
+        arr[11] = None
+        gc.collect()
+        self.assertIsNotNone(ref())
+        arr[19] = None
+        gc.collect()
+        self.assertIsNone(ref())
+
+
+class TestTypedArray(unittest.TestCase):
+
+    def test_int_array(self):
+        arr = IntArray(1000)
+        self.assertEqual(len(arr), 1000)
+        self.assertEqual(arr[999], 0)
+        arr[5] = 2 ** 40
+        self.assertEqual(arr[5], 2 ** 40)
+        self.assertRaises(TypeError, lambda: arr.__setitem__(0, None))
+        self.assertRaises(OverflowError, lambda: arr.__setitem__(0, 2 ** 64))
+        self.assertEqual(IntArray(3, fill=-1)[2], -1)
+
+    def test_float_array(self):
+        arr = FloatArray(4, fill=0.5)
+        arr[1] = 2.25
+        self.assertEqual([arr[i] for i in range(4)], [0.5, 2.25, 0.5, 0.5])
+        self.assertRaises(ValueError, lambda: FloatArray(0))
+
+
+class TestArrayRBulk(unittest.TestCase):
+
+    def make(self, length):
+        arr = ArrayR(length)
+        for i in range(length):
+            arr[i] = i
+        return arr
+
+    def test_iter_and_slices(self):
+        arr = self.make(10)
+        self.assertEqual(list(arr), list(range(10)))
+        self.assertEqual(arr[2:5], [2, 3, 4])
+        self.assertEqual(arr[::-3], [9, 6, 3, 0])
+        arr[1:4] = "abc"
+        self.assertEqual(arr[0:5], [0, "a", "b", "c", 4])
+        self.assertRaises(ValueError, lambda: arr.__setitem__(slice(0, 2), [1]))
+
+    def test_copy_from(self):
+        arr = self.make(8)
+        other = ArrayR(4)
+        other.copy_from(arr, 5, 1, 3)
+        self.assertEqual(list(other), [None, 5, 6, 7])
+        # Overlapping copy within the same array.
+        arr.copy_from(arr, 0, 2, 5)
+        self.assertEqual(list(arr), [0, 1, 0, 1, 2, 3, 4, 7])
+        self.assertRaises(IndexError, lambda: other.copy_from(arr, 6, 0, 3))
+        self.assertRaises(IndexError, lambda: other.copy_from(arr, 0, 2, 3))
+
+    def test_fill_releases(self):
+        class Item:
+            pass
+        arr = ArrayR(6)
+        item = Item()
+        ref = weakref.ref(item)
+        arr.fill(item)
+        self.assertTrue(all(x is item for x in arr))
+        arr.fill(None, 1, 3)
+        self.assertEqual([x is item for x in arr], [True, False, False, True, True, True])
+        del item
+        arr[4:] = [None, None]
+        arr.copy_from(ArrayR(1), 0, 0, 1)
+        gc.collect()
+        self.assertIsNotNone(ref())
+        arr.fill(None, 3)
+        gc.collect()
+        self.assertIsNone(ref())
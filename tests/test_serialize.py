@@ -0,0 +1,17 @@
+import json
+import unittest
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from serialize import serialize, deserialize
+
+class TestSerialize(unittest.TestCase):
+
+    def test_round_trip(self):
+        trail = Trail(TrailSplit(
+            Trail(TrailSeries(Mountain("top", 1, 2), Trail(None))),
+            Trail(None),
+            Trail(TrailSeries(Mountain("follow é", 3, 4), Trail(None))),
+        ))
+        text = serialize(trail)
+        self.assertEqual(serialize(deserialize(json.loads(text))), text)
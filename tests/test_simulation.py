@@ -0,0 +1,54 @@
+import unittest
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+from simulation import simulate
+import simulation
+
+class TestSimulation(unittest.TestCase):
+
+    def setUp(self):
+        self.top = Mountain("top", 3, 10)
+        self.bottom = Mountain("bottom", 1, 20)
+        self.final = Mountain("final", 2, 5)
+        self.trail = Trail(TrailSplit(
+            Trail(TrailSeries(self.top, Trail(None))),
+            Trail(TrailSeries(self.bottom, Trail(None))),
+            Trail(TrailSeries(self.final, Trail(None))),
+        ))
+
+    def test_totals(self):
+        stats = simulate(self.trail, 500, seed=1, processes=1, top_probability=0.25)
+        self.assertEqual(stats.walkers, 500)
+        self.assertEqual(stats.visits["final"], 500)
+        self.assertEqual(stats.visits["top"] + stats.visits["bottom"], 500)
+        self.assertLess(stats.visits["top"], stats.visits["bottom"])
+        self.assertEqual(stats.lengths, {15: stats.visits["top"], 25: stats.visits["bottom"]})
+        self.assertEqual(stats.difficulties, {5: stats.visits["top"], 3: stats.visits["bottom"]})
+        self.assertRaises(ValueError, lambda: simulate(self.trail, -1))
+
+    def test_reproducible(self):
+        old_chunk = simulation.CHUNK_SIZE
+        simulation.CHUNK_SIZE = 100
+        try:
+            alone = simulate(self.trail, 1050, seed=7, processes=1)
+            parallel = simulate(self.trail, 1050, seed=7, processes=2)
+            other = simulate(self.trail, 1050, seed=8, processes=1)
+        finally:
+            simulation.CHUNK_SIZE = old_chunk
+        self.assertEqual(alone, parallel)
+        self.assertEqual(alone.walkers, 1050)
+        self.assertNotEqual(alone.visits, other.visits)
+
+    def test_deep_trail_in_workers(self):
+        # Far deeper than json itself can nest.
+        trail = Trail(None)
+        for i in range(5000):
+            trail = Trail(TrailSeries(Mountain(f"m{i}", 1, 1), trail))
+        old_chunk = simulation.CHUNK_SIZE
+        simulation.CHUNK_SIZE = 2
+        try:
+            stats = simulate(trail, 4, processes=2)
+        finally:
+            simulation.CHUNK_SIZE = old_chunk
+        self.assertEqual(stats.lengths, {5000: 4})
@@ -0,0 +1,43 @@
+import unittest
+
+from data_structures.stack_adt import ArrayStack
+from data_structures.linked_stack import LinkedStack, Node
+
+class TestStacks(unittest.TestCase):
+
+    def check_stack(self, stack):
+        self.assertTrue(stack.is_empty())
+        self.assertRaises(Exception, stack.pop)
+        self.assertRaises(Exception, stack.peek)
+        for i in range(100):
+            stack.push(i)
+        self.assertEqual(len(stack), 100)
+        self.assertFalse(stack.is_full())
+        self.assertEqual(stack.peek(), 99)
+        self.assertEqual([stack.pop() for _ in range(60)], list(range(99, 39, -1)))
+        stack.push("x")
+        self.assertEqual(stack.pop(), "x")
+        self.assertEqual(len(stack), 40)
+        stack.clear()
+        self.assertTrue(stack.is_empty())
+        stack.push(1)
+        self.assertEqual(stack.peek(), 1)
+
+    def test_array_stack(self):
+        stack = ArrayStack()
+        self.check_stack(stack)
+        self.assertEqual(len(stack.array), 128)
+        self.assertEqual(len(ArrayStack(10).array), 10)
+
+    def test_array_stack_releases(self):
+        stack = ArrayStack()
+        for i in range(5):
+            stack.push([i])
+        stack.pop()
+        self.assertIsNone(stack.array[4])
+        stack.clear()
+        self.assertEqual(list(stack.array)[:4], [None] * 4)
+
+    def test_linked_stack(self):
+        self.check_stack(LinkedStack())
+        self.assertFalse(hasattr(Node(1), "__dict__"))
@@ -112,3 +112,73 @@ class TestTrailMethods(unittest.TestCase):
         self.assertIsInstance(res, TrailSeries)
         self.assertEqual(res.mountain, m)
         self.assertEqual(res.following.store, None)
+
+    def test_edit_shares_untouched(self):
+        a, b, c = (Mountain(letter, 1, 1) for letter in "abc")
+        top = Trail(TrailSeries(a, Trail(None)))
+        bottom = Trail(TrailSeries(b, Trail(None)))
+        t = Trail(TrailSplit(top, bottom, Trail(None)))
+
+        res = t.edit(["path_top", "following"], lambda trail: trail.add_mountain_before(c))
+        self.assertEqual([m.name for m in res.collect_all_mountains()], ["a", "c", "b"])
+        # The old version is unchanged, and everything off the path is shared.
+        self.assertEqual([m.name for m in t.collect_all_mountains()], ["a", "b"])
+        self.assertIs(res.store.path_bottom, bottom)
+        self.assertIs(res.store.path_follow, t.store.path_follow)
+        self.assertIsNot(res.store.path_top, top)
+        self.assertIs(res.store.path_top.store.mountain, a)
+
+        self.assertIs(t.edit([], lambda trail: trail), t)
+        self.assertRaises(ValueError, lambda: t.edit(["following"], lambda trail: trail))
+        self.assertRaises(ValueError, lambda: t.edit(["path_top", "mountain"], lambda trail: trail))
+
+    def test_persistent_draw(self):
+        from constants import DrawMode
+        from draw_trails import TrailDraw
+
+        class QuietDraw(TrailDraw):
+            def draw_line(self, *args):
+                pass
+            def draw_mountain(self, *args):
+                pass
+
+        a, b = Mountain("a", 1, 1), Mountain("b", 1, 1)
+        first = Trail(TrailSeries(a, Trail(None)))
+        draw = QuietDraw(first, persistent=True)
+        draw.draw_in_box(100, 500, 0, 0)
+        # Click just after a.
+        after = draw.trail.store.after_box
+        box, action, _ = draw.box_and_action((after.x + after.w / 2, after.y + after.h / 2), DrawMode.ADD_MOUNTAIN)
+        self.assertIs(box, after)
+        action(b)
+        self.assertEqual([m.name for m in draw.trail.collect_all_mountains()], ["a", "b"])
+        self.assertEqual([m.name for m in first.collect_all_mountains()], ["a"])
+        self.assertTrue(draw.undo())
+        self.assertIs(draw.trail, first)
+        self.assertFalse(draw.undo())
+        self.assertTrue(draw.redo())
+        self.assertEqual(len(draw.trail.collect_all_mountains()), 2)
+        self.assertFalse(draw.redo())
+
+    def test_in_place_draw_invalidates_sizes(self):
+        from constants import DrawMode
+        from draw_trails import TrailDraw
+
+        class QuietDraw(TrailDraw):
+            def draw_line(self, *args):
+                pass
+            def draw_mountain(self, *args):
+                pass
+            def draw_branch(self, *args):
+                pass
+
+        a, b = Mountain("a", 1, 1), Mountain("b", 1, 1)
+        inner = Trail(TrailSeries(a, Trail(None)))
+        draw = QuietDraw(Trail(TrailSplit(inner, Trail(None), Trail(None))))
+        draw.draw_in_box(100, 500, 0, 0)
+        width = draw.required_width()
+        after = inner.store.after_box
+        _, action, _ = draw.box_and_action((after.x + after.w / 2, after.y + after.h / 2), DrawMode.ADD_MOUNTAIN)
+        action(b)
+        # The root's cached width was dropped along with the edited spine.
+        self.assertEqual(draw.required_width(), width + TrailDraw.TOTAL_MOUNTAIN_WIDTH)
@@ -2,7 +2,7 @@ import unittest
 from ed_utils.decorators import number
 
 from mountain import Mountain
-from trail import Trail, TrailSeries, TrailSplit, TrailStore
+from trail import Trail, TrailSeries, TrailSplit, TrailStore, PathLengthStats, TrailAggregates
 
 class TestTrailMethods(unittest.TestCase):
 
@@ -57,3 +57,103 @@ class TestTrailMethods(unittest.TestCase):
             self.top_bot, self.top_top, self.top_mid,
             self.bot_one, self.bot_two, self.final
         ])))
+
+    def test_count_length_k_paths(self):
+        self.load_example()
+        self.assertEqual(self.trail.count_length_k_paths(3), 3)
+        self.assertEqual(self.trail.count_length_k_paths(2), 1)
+        self.assertEqual(self.trail.count_length_k_paths(4), 0)
+        self.assertEqual(Trail(None).count_length_k_paths(0), 1)
+        self.assertRaises(ValueError, lambda: self.trail.count_length_k_paths(-1))
+
+    def test_iter_length_k_paths_is_lazy(self):
+        # 40 splits in series, each with a mountain on both branches: 2**40 paths.
+        trail = Trail(None)
+        for i in range(40):
+            trail = Trail(TrailSplit(
+                Trail(TrailSeries(Mountain(f"top-{i}", 1, 1), Trail(None))),
+                Trail(TrailSeries(Mountain(f"bot-{i}", 1, 1), Trail(None))),
+                trail,
+            ))
+        self.assertEqual(trail.count_length_k_paths(40), 2 ** 40)
+        self.assertEqual(trail.count_length_k_paths(39), 0)
+        paths = trail.iter_length_k_paths(40)
+        first, second = next(paths), next(paths)
+        names = []
+        node = first
+        while node is not None:
+            names.append(node.item.name)
+            node = node.link
+        self.assertEqual(names, [f"top-{i}" for i in range(39, -1, -1)])
+        # Both paths start differently but share everything after.
+        self.assertIsNot(first, second)
+        self.assertIs(first.link, second.link)
+
+    def all_paths(self, trail):
+        """Every path through trail, by brute force."""
+        store = trail.store
+        if store is None:
+            return [[]]
+        if isinstance(store, TrailSeries):
+            return [[store.mountain] + path for path in self.all_paths(store.following)]
+        branches = self.all_paths(store.path_top) + self.all_paths(store.path_bottom)
+        return [before + after for before in branches for after in self.all_paths(store.path_follow)]
+
+    def test_shared_subtrees(self):
+        # The same split is both the top branch and after x, with different paths reaching it.
+        a, x, y, z = (Mountain(name, 1, 1) for name in "axyz")
+        shared = Trail(TrailSplit(Trail(TrailSeries(a, Trail(None))), Trail(None), Trail(None)))
+        trail = Trail(TrailSplit(
+            shared,
+            Trail(TrailSeries(y, Trail(TrailSeries(z, Trail(None))))),
+            Trail(TrailSeries(x, shared)),
+        ))
+        # And twice more, in series.
+        trail = Trail(TrailSplit(trail, shared, trail))
+        paths = self.all_paths(trail)
+        names = lambda path_list: sorted([mountain.name for mountain in path] for path in path_list)
+        for k in range(8):
+            expected = [path for path in paths if len(path) == k]
+            self.assertEqual(names(trail.length_k_paths(k)), names(expected))
+            self.assertEqual(trail.count_length_k_paths(k), len(expected))
+
+    def test_length_histogram(self):
+        self.load_example()
+        self.assertEqual(self.trail.length_histogram(), {
+            2: PathLengthStats(1, 9, 9, 6, 6),
+            3: PathLengthStats(3, 9, 16, 6, 13),
+        })
+        self.assertEqual(self.trail.length_histogram(2), {2: PathLengthStats(1, 9, 9, 6, 6)})
+        self.assertEqual(Trail(None).length_histogram(), {0: PathLengthStats(1, 0, 0, 0, 0)})
+
+    def test_aggregates(self):
+        self.load_example()
+        self.assertEqual(self.trail.aggregates(), TrailAggregates(6, 0, 5, 2, 3))
+        self.assertEqual(Trail(None).aggregates(), TrailAggregates(0, None, None, 0, 0))
+        self.assertEqual(self.trail.store.path_bottom.aggregates(), TrailAggregates(2, 0, 2, 1, 2))
+
+    def test_measure_cache(self):
+        self.load_example()
+        measured = []
+        def count(trail, below):
+            measured.append(trail)
+            return sum(below) + isinstance(trail.store, TrailSeries)
+        self.assertEqual(self.trail.measure("count", count), 6)
+        total = len(measured)
+        self.assertEqual(self.trail.measure("count", count), 6)
+        self.assertEqual(len(measured), total)
+
+        # Change the bottom branch in place: its store is new, the root needs telling.
+        bottom = self.trail.store.path_bottom
+        bottom.store = bottom.store.remove_mountain()
+        self.trail.invalidate()
+        measured.clear()
+        self.assertEqual(self.trail.measure("count", count), 5)
+        self.assertEqual(measured, [bottom, self.trail])
+
+        # Edits share untouched trails, and their cached values with them.
+        measured.clear()
+        edited = self.trail.edit(["path_follow"], lambda trail: trail.add_mountain_before(self.bot_one))
+        self.assertEqual(edited.measure("count", count), 6)
+        # Only the new root and the new series trail in front of the old following path.
+        self.assertEqual(len(measured), 2)
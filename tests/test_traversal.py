@@ -59,3 +59,172 @@ class TestTrailMethods(unittest.TestCase):
         self.trail.follow_path(cw)
 
         self.assertListEqual(cw.mountains, [self.bot_one, self.bot_two, self.final])
+
+    def test_deep_series(self):
+        # Far deeper than the recursion limit.
+        depth = 200_000
+        m = Mountain("m", 1, 1)
+        trail = Trail(None)
+        for _ in range(depth):
+            trail = Trail(TrailSeries(m, trail))
+        self.assertEqual(len(trail.collect_all_mountains()), depth)
+        bw = BottomWalker()
+        trail.follow_path(bw)
+        self.assertEqual(len(bw.mountains), depth)
+
+    def test_deep_splits(self):
+        depth = 50_000
+        trail = Trail(None)
+        for i in range(depth):
+            trail = Trail(TrailSplit(
+                trail,
+                Trail(TrailSeries(Mountain(f"bot-{i}", 1, 1), Trail(None))),
+                Trail(TrailSeries(Mountain(f"follow-{i}", 1, 1), Trail(None))),
+            ))
+        mountains = trail.collect_all_mountains()
+        self.assertEqual(len(mountains), 2 * depth)
+        # Pre-order: the innermost split comes first, then each level's bottom and following.
+        self.assertEqual([m.name for m in mountains[:4]], ["bot-0", "follow-0", "bot-1", "follow-1"])
+        tw = TopWalker()
+        trail.follow_path(tw)
+        self.assertEqual([m.name for m in tw.mountains[:2]], ["follow-0", "follow-1"])
+        self.assertEqual(len(tw.mountains), depth)
+
+    def test_deep_draw_and_deserialize(self):
+        from draw_trails import TrailDraw
+        from serialize import deserialize
+        depth = 100_000
+        obj = {"store": None}
+        for i in range(depth):
+            obj = {"store": {"mountain": {"name": str(i), "difficulty_level": 1, "length": 1}, "following": obj}}
+        trail = deserialize(obj)
+        mountains = trail.collect_all_mountains()
+        self.assertEqual(mountains[0].name, str(depth - 1))
+        self.assertEqual(mountains[-1].name, "0")
+        draw = TrailDraw(trail)
+        self.assertEqual(draw.required_width(), depth * TrailDraw.TOTAL_MOUNTAIN_WIDTH)
+        self.assertEqual(draw.required_height(), TrailDraw.MOUNTAIN_HEIGHT)
+
+    def test_iter_mountains(self):
+        self.load_example()
+        mountains = self.trail.iter_mountains()
+        self.assertIs(next(mountains), self.top_top)
+        self.assertListEqual(list(mountains), [self.top_bot, self.top_mid, self.bot_one, self.bot_two, self.final])
+        self.assertListEqual(self.trail.collect_all_mountains(), list(self.trail.iter_mountains()))
+        self.assertListEqual(list(Trail(None).iter_mountains()), [])
+
+    def test_follow_paths(self):
+        class CountingWalker(TopWalker):
+            DETERMINISTIC = True
+            calls = 0
+            def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+                CountingWalker.calls += 1
+                return True
+
+        class AlternatingWalker(WalkerPersonality):
+            def __init__(self, first: bool) -> None:
+                super().__init__()
+                self.next = first
+            def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+                self.next = not self.next
+                return not self.next
+
+        self.load_example()
+        walkers = [TopWalker(), BottomWalker(), LazyWalker(), AlternatingWalker(True), AlternatingWalker(False)]
+        walkers += [CountingWalker() for _ in range(100)]
+        self.trail.follow_paths(walkers)
+        self.assertListEqual(walkers[0].mountains, [self.top_top, self.top_mid, self.final])
+        self.assertListEqual(walkers[1].mountains, [self.bot_one, self.final])
+        self.assertListEqual(walkers[2].mountains, [self.top_bot, self.top_mid, self.final])
+        # Top then bottom, and bottom then top.
+        self.assertListEqual(walkers[3].mountains, [self.top_bot, self.top_mid, self.final])
+        self.assertListEqual(walkers[4].mountains, [self.bot_one, self.bot_two, self.final])
+        # One decision per split for the whole deterministic group.
+        self.assertEqual(CountingWalker.calls, 2)
+        self.assertListEqual(walkers[-1].mountains, walkers[0].mountains)
+
+    def test_compiled_routes(self):
+        class CountingWalker(LazyWalker):
+            DETERMINISTIC = True
+            calls = 0
+            def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+                CountingWalker.calls += 1
+                return super().select_branch(top_branch, bottom_branch)
+
+        self.load_example()
+        route = self.trail.compile_route(CountingWalker())
+        self.assertEqual(route, (self.top_bot, self.top_mid, self.final))
+        self.assertEqual(CountingWalker.calls, 2)
+        self.assertIs(self.trail.compile_route(CountingWalker()), route)
+        walkers = [CountingWalker() for _ in range(10)]
+        for walker in walkers:
+            self.trail.replay(walker)
+            self.assertListEqual(walker.mountains, list(route))
+        # follow_path uses the compiled route too.
+        walker = CountingWalker()
+        self.trail.follow_path(walker)
+        self.assertListEqual(walker.mountains, list(route))
+        self.assertEqual(CountingWalker.calls, 2)
+
+        self.assertEqual(self.trail.compile_route(BottomWalker()), (self.bot_one, self.final))
+        edited = self.trail.edit(["path_bottom"], lambda trail: trail.add_mountain_before(self.bot_two))
+        self.assertEqual(edited.compile_route(BottomWalker()), (self.bot_two, self.bot_one, self.final))
+        self.assertEqual(self.trail.compile_route(BottomWalker()), (self.bot_one, self.final))
+
+        class ChoosyWalker(WalkerPersonality):
+            def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+                return True
+        self.assertRaises(ValueError, lambda: self.trail.compile_route(ChoosyWalker()))
+
+    def test_in_place_edits_drop_routes(self):
+        self.load_example()
+        self.assertEqual(self.trail.compile_route(LazyWalker()), (self.top_bot, self.top_mid, self.final))
+
+        # Editing a mountain in place, as main.py does, then invalidating everything.
+        self.top_top.difficulty_level = 1
+        self.trail.invalidate_all()
+        walker = LazyWalker()
+        self.trail.follow_path(walker)
+        self.assertListEqual(walker.mountains, [self.top_top, self.top_mid, self.final])
+        self.assertEqual(self.trail.compile_route(LazyWalker()), (self.top_top, self.top_mid, self.final))
+
+        # Replacing a store deeper down in place, then invalidating the spine down to it.
+        inner = self.trail.store.path_top
+        inner.store = inner.store.path_bottom.store
+        self.trail.invalidate()
+        walker = LazyWalker()
+        self.trail.follow_path(walker)
+        # top-bot is now harder than bot-one, so the walk goes down instead.
+        self.assertListEqual(walker.mountains, [self.bot_one, self.final])
+
+    def test_overridden_select_branch_not_trusted(self):
+        # Inherits DETERMINISTIC from TopWalker, but chooses differently every time.
+        class FlipWalker(TopWalker):
+            def __init__(self) -> None:
+                super().__init__()
+                self.flip = False
+            def select_branch(self, top_branch: Trail, bottom_branch: Trail) -> bool:
+                self.flip = not self.flip
+                return self.flip
+
+        class StillTopWalker(TopWalker):
+            pass
+
+        self.assertFalse(FlipWalker.is_deterministic())
+        self.assertTrue(StillTopWalker.is_deterministic())
+        self.assertTrue(LazyWalker.is_deterministic())
+
+        self.load_example()
+        self.trail.compile_route(TopWalker())
+        self.assertRaises(ValueError, lambda: self.trail.compile_route(FlipWalker()))
+        # Top at the first split, bottom at the second.
+        expected = [self.top_bot, self.top_mid, self.final]
+        walker = FlipWalker()
+        self.trail.follow_path(walker)
+        self.assertListEqual(walker.mountains, expected)
+        walkers = [FlipWalker() for _ in range(3)]
+        walkers[1].flip = True
+        self.trail.follow_paths(walkers)
+        self.assertListEqual(walkers[0].mountains, expected)
+        self.assertListEqual(walkers[1].mountains, [self.bot_one, self.bot_two, self.final])
+        self.assertListEqual(walkers[2].mountains, expected)
@@ -1,9 +1,14 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from mountain import Mountain
+from algorithms.traversal import depth_first, fold, preorder
+from algorithms.path_counts import PathCounts, count_at, either, then
+from data_structures.linked_stack import Node
 
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Sequence, TypeVar, Union
+
+R = TypeVar("R")
 
 # Avoid circular imports for typing.
 if TYPE_CHECKING:
@@ -24,8 +29,12 @@ class TrailSplit:
     path_follow: Trail
 
     def remove_branch(self) -> TrailStore:
-        """Removes the branch, should just leave the remaining following trail."""
-        raise NotImplementedError()
+        """
+        Removes the branch, should just leave the remaining following trail.
+
+        :complexity: O(1)
+        """
+        return self.path_follow.store
 
 @dataclass
 class TrailSeries:
@@ -40,47 +49,443 @@ class TrailSeries:
     following: Trail
 
     def remove_mountain(self) -> TrailStore:
-        """Removes the mountain at the beginning of this series."""
-        raise NotImplementedError()
+        """
+        Removes the mountain at the beginning of this series.
+
+        :complexity: O(1)
+        """
+        return self.following.store
 
     def add_mountain_before(self, mountain: Mountain) -> TrailStore:
-        """Adds a mountain in series before the current one."""
-        raise NotImplementedError()
+        """
+        Adds a mountain in series before the current one.
+
+        :complexity: O(1)
+        """
+        return TrailSeries(mountain, Trail(self))
 
     def add_empty_branch_before(self) -> TrailStore:
-        """Adds an empty branch, where the current trailstore is now the following path."""
-        raise NotImplementedError()
+        """
+        Adds an empty branch, where the current trailstore is now the following path.
+
+        :complexity: O(1)
+        """
+        return TrailSplit(Trail(None), Trail(None), Trail(self))
 
     def add_mountain_after(self, mountain: Mountain) -> TrailStore:
-        """Adds a mountain after the current mountain, but before the following trail."""
-        raise NotImplementedError()
+        """
+        Adds a mountain after the current mountain, but before the following trail.
+
+        :complexity: O(1)
+        """
+        return TrailSeries(self.mountain, Trail(TrailSeries(mountain, self.following)))
 
     def add_empty_branch_after(self) -> TrailStore:
-        """Adds an empty branch after the current mountain, but before the following trail."""
-        raise NotImplementedError()
+        """
+        Adds an empty branch after the current mountain, but before the following trail.
+
+        :complexity: O(1)
+        """
+        return TrailSeries(self.mountain, Trail(TrailSplit(Trail(None), Trail(None), self.following)))
 
 TrailStore = Union[TrailSplit, TrailSeries, None]
 
+@dataclass
+class _SplitPaths:
+    """
+    Path counts at one position of a split in a trail, for iter_length_k_paths.
+    A trail shared by several positions gets one of these per position,
+    as the paths reaching it differ.
+    """
+
+    # Paths through each branch.
+    top: PathCounts
+    bottom: PathCounts
+    # The first split along each branch and the following trail (if any),
+    # with the number of mountains before it.
+    top_next: tuple[_SplitPaths|None, int]
+    bottom_next: tuple[_SplitPaths|None, int]
+    follow_next: tuple[_SplitPaths|None, int]
+    # Paths from the very start to the end of each branch.
+    reach_top: PathCounts|None = None
+    reach_bottom: PathCounts|None = None
+
+@dataclass(frozen=True)
+class PathLengthStats:
+    """
+    The paths with some number of mountains: how many there are,
+    and the range of their total length and total difficulty.
+    """
+
+    count: int
+    min_length: int
+    max_length: int
+    min_difficulty: int
+    max_difficulty: int
+
+# Path stats by number of mountains are kept as (entries, shift, length, difficulty):
+# entries[j] is a (count, min length, max length, min difficulty, max difficulty)
+# tuple (or None) for paths with j + shift mountains, with length and difficulty
+# still to be added to its totals. So like PathCounts, series are O(1) each.
+PathStats = tuple[list[Union[tuple, None]], int, int, int]
+
+def _stats_entries(stats: PathStats, max_k: int|None) -> list[tuple|None]:
+    """The stats for paths with 0, 1, ... mountains, with everything added in."""
+    entries, shift, length, difficulty = stats
+    size = len(entries) + shift
+    if max_k is not None:
+        size = min(size, max_k + 1)
+    res = [None] * size
+    for j in range(shift, size):
+        entry = entries[j - shift]
+        if entry is not None:
+            count, min_l, max_l, min_d, max_d = entry
+            res[j] = (count, min_l + length, max_l + length, min_d + difficulty, max_d + difficulty)
+    return res
+
+def _merge_stats(a: tuple|None, b: tuple|None) -> tuple|None:
+    """Stats for paths that are either those of a or those of b."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return (a[0] + b[0], min(a[1], b[1]), max(a[2], b[2]), min(a[3], b[3]), max(a[4], b[4]))
+
+def _either_stats(a: PathStats, b: PathStats, max_k: int|None) -> PathStats:
+    first, second = _stats_entries(a, max_k), _stats_entries(b, max_k)
+    if len(first) < len(second):
+        first, second = second, first
+    res = first[:]
+    for j in range(len(second)):
+        res[j] = _merge_stats(res[j], second[j])
+    return res, 0, 0, 0
+
+def _then_stats(a: PathStats, b: PathStats, max_k: int|None) -> PathStats:
+    """
+    Stats for a path through a then b: counts multiply and totals add,
+    like multiplying polynomials whose coefficients are the stats.
+
+    :complexity: O(A*B) where A and B are the number of path lengths in a and b.
+    """
+    first, second = _stats_entries(a, max_k), _stats_entries(b, max_k)
+    size = len(first) + len(second) - 1
+    if max_k is not None:
+        size = min(size, max_k + 1)
+    res = [None] * size
+    for i in range(len(first)):
+        x = first[i]
+        if x is None:
+            continue
+        for j in range(min(len(second), size - i)):
+            y = second[j]
+            if y is not None:
+                res[i + j] = _merge_stats(res[i + j], (
+                    x[0] * y[0], x[1] + y[1], x[2] + y[2], x[3] + y[3], x[4] + y[4]
+                ))
+    return res, 0, 0, 0
+
+@dataclass(frozen=True)
+class TrailAggregates:
+    """
+    Facts about a whole trail, cached on it by Trail.aggregates.
+    Path lengths are numbers of mountains, as in length_k_paths.
+    """
+
+    mountains: int
+    min_difficulty: int|None
+    max_difficulty: int|None
+    min_path_length: int
+    max_path_length: int
+
+def _aggregate(trail: Trail, below: list[TrailAggregates]) -> TrailAggregates:
+    store = trail.store
+    if store is None:
+        return TrailAggregates(0, None, None, 0, 0)
+    if isinstance(store, TrailSeries):
+        following = below[0]
+        difficulty = store.mountain.difficulty_level
+        return TrailAggregates(
+            following.mountains + 1,
+            min(difficulty, following.min_difficulty) if following.mountains else difficulty,
+            max(difficulty, following.max_difficulty) if following.mountains else difficulty,
+            following.min_path_length + 1,
+            following.max_path_length + 1,
+        )
+    top, bottom, follow = below
+    difficulties = [aggregates for aggregates in below if aggregates.mountains]
+    return TrailAggregates(
+        top.mountains + bottom.mountains + follow.mountains,
+        min((a.min_difficulty for a in difficulties), default=None),
+        max((a.max_difficulty for a in difficulties), default=None),
+        min(top.min_path_length, bottom.min_path_length) + follow.min_path_length,
+        max(top.max_path_length, bottom.max_path_length) + follow.max_path_length,
+    )
+
 @dataclass
 class Trail:
 
     store: TrailStore = None
 
     def add_mountain_before(self, mountain: Mountain) -> Trail:
-        """Adds a mountain before everything currently in the trail."""
-        raise NotImplementedError()
+        """
+        Adds a mountain before everything currently in the trail.
+
+        :complexity: O(1)
+        """
+        return Trail(TrailSeries(mountain, self))
 
     def add_empty_branch_before(self) -> Trail:
-        """Adds an empty branch before everything currently in the trail."""
-        raise NotImplementedError()
+        """
+        Adds an empty branch before everything currently in the trail.
+
+        :complexity: O(1)
+        """
+        return Trail(TrailSplit(Trail(None), Trail(None), self))
+
+    def edit(self, path: Sequence[str], change: Callable[[Trail], Trail]) -> Trail:
+        """
+        Returns a new trail where the trail at path is replaced by change(that trail),
+        leaving this trail untouched.
+
+        path names the store attribute to follow at each step, starting from this trail,
+        e.g. ["path_top", "following"]. Only the trails along path are copied,
+        everything else is shared with this trail, so old versions stay valid
+        as long as nothing changes a trail in place.
+
+        :complexity: O(len(path)) plus the cost of change.
+        :raises ValueError: when path does not lead to a trail.
+        """
+        spine = []
+        cur_trail = self
+        for attribute in path:
+            following = getattr(cur_trail.store, attribute, None)
+            if not isinstance(following, Trail):
+                raise ValueError(f"{attribute} is not a trail in {type(cur_trail.store).__name__}.")
+            spine.append((cur_trail.store, attribute))
+            cur_trail = following
+        res = change(cur_trail)
+        for store, attribute in reversed(spine):
+            res = Trail(replace(store, **{attribute: res}))
+        return res
+
+    def measure(self, key, combine: Callable[[Trail, list], R]) -> R:
+        """
+        Returns fold(self, Trail.children, combine), caching the value on this
+        trail and every trail inside it under key.
+
+        A cached value is only used while the trail still has the store it was
+        worked out for, so replacing a store is noticed by that trail. Changing
+        a trail deeper down in place is not: call invalidate on the trails
+        above it (the spine down to the change). Changing a mountain in place
+        is not noticed anywhere, so call invalidate_all. Edits through
+        Trail.edit or the edit methods build new trails, so nothing needs
+        invalidating.
+
+        :complexity: O(C) where C is the number of trails without a cached value,
+            times the cost of combine.
+        """
+        def unknown_children(trail: Trail) -> tuple[Trail, ...]:
+            return () if trail._cached(key) else trail.children()
+
+        def combine_and_cache(trail: Trail, below: list) -> R:
+            entry = trail._cached(key)
+            if entry is not None:
+                return entry[1]
+            value = combine(trail, below)
+            trail._cache(key, value)
+            return value
+
+        return fold(self, unknown_children, combine_and_cache)
+
+    def _cached(self, key) -> tuple|None:
+        """The (store, value) cached under key, if still valid."""
+        measures = self.__dict__.get("_measures")
+        if measures is None:
+            return None
+        entry = measures.get(key)
+        if entry is None or entry[0] is not self.store:
+            return None
+        return entry
+
+    def _cache(self, key, value) -> None:
+        """Cache value under key, for as long as the store stays the same."""
+        self.__dict__.setdefault("_measures", {})[key] = (self.store, value)
+
+    def invalidate(self) -> None:
+        """
+        Forget every value cached on this trail by measure or compile_route.
+
+        :complexity: O(1)
+        """
+        self.__dict__.pop("_measures", None)
+
+    def invalidate_all(self) -> None:
+        """
+        Forget every value cached on this trail and every trail inside it,
+        as needed after changing a mountain in place.
+
+        :complexity: O(N) where N is the number of trails inside this one.
+        """
+        for trail in preorder(self, Trail.children):
+            trail.invalidate()
+
+    def aggregates(self) -> TrailAggregates:
+        """
+        Returns the cached TrailAggregates of this trail.
+
+        :complexity: O(1) when cached, otherwise as measure.
+        """
+        return self.measure(TrailAggregates, _aggregate)
+
+    def children(self) -> tuple[Trail, ...]:
+        """
+        The trails directly inside this one, in the order they are walked and drawn.
+
+        :complexity: O(1)
+        """
+        if self.store is None:
+            return ()
+        if isinstance(self.store, TrailSeries):
+            return (self.store.following,)
+        return (self.store.path_top, self.store.path_bottom, self.store.path_follow)
+
+    def _walk(self, select_branch: Callable[[Trail, Trail], bool], add_mountain: Callable[[Mountain], None]) -> None:
+        """
+        Walk one path, choosing branches with select_branch and passing each mountain to add_mountain.
+
+        :complexity: O(N) where N is the number of trails on the path taken,
+            plus the cost of the calls.
+        """
+        def next_trails(trail: Trail) -> tuple[Trail, ...]:
+            store = trail.store
+            if store is None:
+                return ()
+            if isinstance(store, TrailSeries):
+                add_mountain(store.mountain)
+                return (store.following,)
+            if select_branch(store.path_top, store.path_bottom):
+                return (store.path_top, store.path_follow)
+            return (store.path_bottom, store.path_follow)
+
+        depth_first(self, next_trails)
 
     def follow_path(self, personality: WalkerPersonality) -> None:
-        """Follow a path and add mountains according to a personality."""
-        raise NotImplementedError()
+        """
+        Follow a path and add mountains according to a personality.
+        Replays the compiled route instead if one is cached for this personality.
+
+        :complexity: O(N) where N is the number of trails on the path taken,
+            plus the cost of the personality's choices.
+        """
+        if type(personality).is_deterministic():
+            entry = self._cached(("route", type(personality)))
+            if entry is not None:
+                personality.add_mountains(entry[1])
+                return
+        self._walk(personality.select_branch, personality.add_mountain)
+
+    def compile_route(self, personality: WalkerPersonality) -> tuple[Mountain, ...]:
+        """
+        Returns the mountains follow_path would add for a deterministic personality,
+        cached on this trail for every personality of the same class.
+
+        Like measure, the cached route is dropped when this trail's store is
+        replaced or invalidate is called, and new versions made by edits
+        compile their own. After changing a trail inside this one in place,
+        invalidate the spine down to it; after changing a mountain in place,
+        call invalidate_all. Otherwise follow_path replays the stale route.
+
+        :complexity: O(1) when cached, otherwise as follow_path.
+        :raises ValueError: when the personality's class is not deterministic (see is_deterministic).
+        """
+        kind = type(personality)
+        if not kind.is_deterministic():
+            raise ValueError(f"{kind.__name__} does not always choose the same branches.")
+        key = ("route", kind)
+        entry = self._cached(key)
+        if entry is not None:
+            return entry[1]
+        route = []
+        self._walk(personality.select_branch, route.append)
+        route = tuple(route)
+        self._cache(key, route)
+        return route
+
+    def replay(self, personality: WalkerPersonality) -> None:
+        """
+        Add the mountains of the compiled route to a deterministic personality,
+        without any per-split calls once compiled.
+
+        :complexity: O(L) where L is the number of mountains on the route, once compiled.
+        :raises ValueError: when the personality's class is not deterministic (see is_deterministic).
+        """
+        personality.add_mountains(self.compile_route(personality))
+
+    def follow_paths(self, personalities: Iterable[WalkerPersonality]) -> None:
+        """
+        Follow a path for each personality, as follow_path would, in a single walk.
+
+        Walkers move through the trail in groups. At a split, the group is
+        partitioned by branch, asking one walker per deterministic class and
+        every other walker for itself; both parts join up again for the
+        following path. Each walker still has its own calls made in path order.
+
+        :complexity: O(G*N + W*L) where G is the number of groups, N the number
+            of trails, W the number of walkers and L the length of their paths.
+        """
+        # Whether each class of walker is deterministic.
+        trusted = {}
+        def next_trails(frame: tuple[Trail, list[WalkerPersonality]]) -> tuple:
+            trail, walkers = frame
+            store = trail.store
+            if store is None:
+                return ()
+            if isinstance(store, TrailSeries):
+                for walker in walkers:
+                    walker.add_mountain(store.mountain)
+                return ((store.following, walkers),)
+            top, bottom = [], []
+            decisions = {}
+            for walker in walkers:
+                kind = type(walker)
+                if kind not in trusted:
+                    trusted[kind] = kind.is_deterministic()
+                if not trusted[kind]:
+                    choice = walker.select_branch(store.path_top, store.path_bottom)
+                elif kind in decisions:
+                    choice = decisions[kind]
+                else:
+                    choice = decisions[kind] = walker.select_branch(store.path_top, store.path_bottom)
+                (top if choice else bottom).append(walker)
+            res = []
+            if top:
+                res.append((store.path_top, top))
+            if bottom:
+                res.append((store.path_bottom, bottom))
+            res.append((store.path_follow, walkers))
+            return tuple(res)
+
+        walkers = list(personalities)
+        if walkers:
+            depth_first((self, walkers), next_trails)
+
+    def iter_mountains(self) -> Iterator[Mountain]:
+        """
+        Lazily yields all mountains on the trail, in the order collect_all_mountains lists them.
+
+        :complexity: O(1) amortised per trail inside this one.
+        """
+        for trail in preorder(self, Trail.children):
+            if isinstance(trail.store, TrailSeries):
+                yield trail.store.mountain
 
     def collect_all_mountains(self) -> list[Mountain]:
-        """Returns a list of all mountains on the trail."""
-        raise NotImplementedError()
+        """
+        Returns a list of all mountains on the trail.
+
+        :complexity: O(N) where N is the number of trails inside this one.
+        """
+        return list(self.iter_mountains())
 
     def length_k_paths(self, k) -> list[list[Mountain]]: # Input to this should not exceed k > 50, at most 5 branches.
         """
@@ -88,5 +493,171 @@ class Trail:
         Paths are represented as lists of mountains.
 
         Paths are unique if they take a different branch, even if this results in the same set of mountains.
+
+        :complexity: O(N + S*k^2 + P*L) where N is the number of trails inside this one,
+            S the number of splits, P the number of paths and L the length of the longest.
+        """
+        res = []
+        for path in self.iter_length_k_paths(k):
+            mountains = []
+            while path is not None:
+                mountains.append(path.item)
+                path = path.link
+            res.append(mountains)
+        return res
+
+    def length_histogram(self, max_k: int|None = None) -> dict[int, PathLengthStats]:
+        """
+        Returns, for every number of mountains some path has (up to max_k if given),
+        how many paths have that many and the range of their total length and difficulty.
+        Paths are counted as in length_k_paths, so
+        self.length_histogram()[k].count == len(self.length_k_paths(k)).
+
+        :complexity: O(N + S*K^2) where N is the number of trails inside this one,
+            S the number of splits and K the largest number of mountains counted.
+        """
+        def combine(trail: Trail, below: list[PathStats]) -> PathStats:
+            store = trail.store
+            if store is None:
+                return [(1, 0, 0, 0, 0)], 0, 0, 0
+            if isinstance(store, TrailSeries):
+                entries, shift, length, difficulty = below[0]
+                mountain = store.mountain
+                return entries, shift + 1, length + mountain.length, difficulty + mountain.difficulty_level
+            return _then_stats(_either_stats(below[0], below[1], max_k), below[2], max_k)
+
+        entries = _stats_entries(fold(self, Trail.children, combine), max_k)
+        return {k: PathLengthStats(*entries[k]) for k in range(len(entries)) if entries[k] is not None}
+
+    def _may_have_length(self, k: int) -> bool:
+        """
+        False if aggregates are cached and k is outside their path lengths.
+        Doesn't work out the aggregates itself, caching them is up to the caller.
+        """
+        entry = self._cached(TrailAggregates)
+        if entry is None:
+            return True
+        return entry[1].min_path_length <= k <= entry[1].max_path_length
+
+    def _path_counts(self, k: int) -> PathCounts:
+        """
+        Count the paths through this trail by number of mountains, up to k.
+
+        :complexity: O(N + S*k^2) where N is the number of trails inside this one and S the number of splits.
+        """
+        def combine(trail: Trail, below: list[PathCounts]) -> PathCounts:
+            store = trail.store
+            if store is None:
+                return [1], 0
+            if isinstance(store, TrailSeries):
+                vector, shift = below[0]
+                return vector, shift + 1
+            return then(either(below[0], below[1], k), below[2], k)
+
+        return fold(self, Trail.children, combine)
+
+    def _split_paths(self, k: int) -> tuple[PathCounts, _SplitPaths|None, int]:
+        """
+        Count the paths through this trail by number of mountains, up to k,
+        keeping the counts at every position of a split.
+
+        :return: The counts, and the first split along this trail with the number of mountains before it.
+        :complexity: O(N + S*k^2) where N is the number of trails inside this one and S the number of splits.
+        """
+        def combine(trail: Trail, below: list[tuple]) -> tuple[PathCounts, _SplitPaths|None, int]:
+            store = trail.store
+            if store is None:
+                return ([1], 0), None, 0
+            if isinstance(store, TrailSeries):
+                (vector, shift), split, before = below[0]
+                return (vector, shift + 1), split, before + 1
+            top, bottom, follow = below
+            split = _SplitPaths(top[0], bottom[0], top[1:], bottom[1:], follow[1:])
+            return then(either(top[0], bottom[0], k), follow[0], k), split, 0
+
+        return fold(self, Trail.children, combine)
+
+    def count_length_k_paths(self, k: int) -> int:
+        """
+        Returns the number of paths containing exactly k mountains, without listing them.
+
+        :complexity: O(N + S*k^2) where N is the number of trails inside this one and S the number of splits.
+        :raises ValueError: when k is negative.
         """
-        raise NotImplementedError()
+        if k < 0:
+            raise ValueError("k must not be negative.")
+        if not self._may_have_length(k):
+            return 0
+        return count_at(self._path_counts(k), k)
+
+    def iter_length_k_paths(self, k: int) -> Iterator[Node[Mountain]|None]:
+        """
+        Lazily yields every path containing exactly k mountains.
+
+        Each path is a chain of linked nodes, starting at its first mountain
+        (None for the empty path). Paths are built from their last mountain
+        backwards, so paths ending the same way share those nodes.
+        A branch is only taken if some path through it has exactly k mountains,
+        so no work is spent on paths that are never yielded.
+
+        :complexity: O(N + S*k^2) before the first path, then O(L) per path,
+            where L is the number of trails along it.
+        :raises ValueError: when k is negative.
+        """
+        if k < 0:
+            raise ValueError("k must not be negative.")
+        if not self._may_have_length(k):
+            return
+        counts, first_split, first_before = self._split_paths(k)
+        if count_at(counts, k) == 0:
+            return
+
+        # Fill in the paths reaching each split position. Frames are
+        # (split, mountains before it since the last split, paths reaching that split).
+        def visit(frame: tuple[_SplitPaths|None, int, PathCounts]) -> tuple:
+            split, before, (vector, shift) = frame
+            if split is None:
+                return ()
+            reaching = (vector, shift + before)
+            split.reach_top = then(reaching, split.top, k)
+            split.reach_bottom = then(reaching, split.bottom, k)
+            return (
+                (*split.top_next, reaching),
+                (*split.bottom_next, reaching),
+                (*split.follow_next, then(reaching, either(split.top, split.bottom, k), k)),
+            )
+
+        depth_first((first_split, first_before, ([1], 0)), visit)
+
+        # Each state is (pending, need, path): pending is a linked stack of
+        # (item, split) pairs of what is left to walk, rightmost first, where
+        # split is the position of the first split along a trail item, or of
+        # a split item. need is how many mountains must still come from it.
+        # States share their pending tails and paths.
+        states = [(((self, first_split), None), k, None)]
+        while states:
+            pending, need, path = states.pop()
+            while pending is not None:
+                (item, split), pending = pending
+                if isinstance(item, Trail):
+                    store = item.store
+                    if isinstance(store, TrailSeries):
+                        pending = ((store.following, split), ((store.mountain, None), pending))
+                    elif store is not None:
+                        pending = ((store.path_follow, split.follow_next[0]), ((store, split), pending))
+                elif isinstance(item, TrailSplit):
+                    # Walked the following path, now pick the branch before it.
+                    top = count_at(split.reach_top, need) > 0
+                    bottom = count_at(split.reach_bottom, need) > 0
+                    if top and bottom:
+                        states.append((((item.path_bottom, split.bottom_next[0]), pending), need, path))
+                    if top:
+                        pending = ((item.path_top, split.top_next[0]), pending)
+                    else:
+                        pending = ((item.path_bottom, split.bottom_next[0]), pending)
+                else:
+                    node = Node(item)
+                    node.link = path
+                    path = node
+                    need -= 1
+            yield path